@@ -0,0 +1,123 @@
+"""Benchmark de contención de la cola de jobs.
+
+Varios workers simulados (un hilo con su propia conexión SQLite cada uno) vacían la cola a la vez
+con dequeue_pending_jobs. Mide dequeues/s, comprueba que ningún job se entregó dos veces y que
+cada worker solo recibió targets permitidos. Después mide la latencia de un dequeue con distintos
+tamaños de cola para confirmar que no crece con el número de pendientes.
+
+Uso:
+    python -m benchmarks.job_queue_contention --jobs 5000 --workers 16 --batch 1
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from video_translator.models import job as job_model
+from video_translator.models.job import JobStatus, JobTarget
+
+TARGETS = (JobTarget.ANY, JobTarget.CLOUD, JobTarget.PC)
+WORKER_IDS = ("render-worker", "local-worker-{}", "generic-worker-{}")
+
+
+def _fill_queue(count: int) -> None:
+    """Inserta `count` jobs pendientes con created_at crecientes, repartidos entre targets."""
+    base = datetime.utcnow() - timedelta(days=1)
+    rows = [
+        (
+            f"bench-{index}",
+            JobStatus.PENDING,
+            TARGETS[index % len(TARGETS)],
+            "bench.mp4",
+            (base + timedelta(microseconds=index)).isoformat(),
+            base.isoformat(),
+        )
+        for index in range(count)
+    ]
+    with job_model.get_db() as conn:
+        conn.execute("DELETE FROM jobs")
+        conn.executemany(
+            "INSERT INTO jobs (id, status, target, input_path, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+
+
+def run_contention(jobs: int, workers: int, batch: int) -> bool:
+    _fill_queue(jobs)
+    handed_out: Counter[str] = Counter()
+    wrong_target: list[str] = []
+    lock = threading.Lock()
+    start = threading.Barrier(workers + 1)
+
+    def worker(index: int) -> None:
+        worker_id = WORKER_IDS[index % len(WORKER_IDS)].format(index)
+        allowed = job_model._allowed_targets(worker_id)
+        received: list[dict] = []
+        start.wait()
+        while claimed := job_model.dequeue_pending_jobs(worker_id, batch):
+            received.extend(claimed)
+        with lock:
+            handed_out.update(job["id"] for job in received)
+            wrong_target.extend(job["id"] for job in received if job["target"] not in allowed)
+        job_model.close_db()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+
+    duplicated = [job_id for job_id, times in handed_out.items() if times > 1]
+    with job_model.get_db() as conn:
+        left = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JobStatus.PENDING,)).fetchone()[0]
+
+    print(f"📦 {jobs} jobs, {workers} workers, lotes de {batch}")
+    print(f"   {len(handed_out) / elapsed:,.0f} jobs/s en {elapsed:.2f}s")
+    print(f"   entregados: {sum(handed_out.values())}, únicos: {len(handed_out)}, pendientes: {left}")
+    print(f"   duplicados: {len(duplicated)}, target no permitido: {len(wrong_target)}")
+    return not duplicated and not wrong_target and left == 0 and len(handed_out) == jobs
+
+
+def run_scaling(sizes: list[int], samples: int) -> None:
+    for size in sizes:
+        _fill_queue(size)
+        started_at = time.perf_counter()
+        for _ in range(samples):
+            job_model.dequeue_pending_jobs("generic-worker", 1)
+        elapsed_ms = (time.perf_counter() - started_at) / samples * 1000
+        print(f"⏱️  {size:>8} pendientes: {elapsed_ms:.3f} ms por dequeue")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de contención de la cola de jobs")
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=1, help="max_jobs por dequeue")
+    parser.add_argument("--sizes", default="1000,50000,200000", help="Tamaños de cola para medir la latencia")
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        job_model.DB_PATH = Path(tmp_dir) / "bench_jobs.db"
+        job_model.init_db()
+        ok = run_contention(args.jobs, args.workers, args.batch)
+        run_scaling([int(size) for size in args.sizes.split(",")], args.samples)
+        job_model.close_db()
+
+    if not ok:
+        print("❌ La cola entregó jobs duplicados o de otro target")
+        sys.exit(1)
+    print("✅ Ningún job se entregó dos veces")
+
+
+if __name__ == "__main__":
+    main()
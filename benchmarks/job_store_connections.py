@@ -0,0 +1,119 @@
+"""Benchmark de conexiones del job store.
+
+Compara el get_db anterior (una conexión nueva por llamada, journal en modo rollback) con el actual
+(una conexión reutilizada por hilo, WAL y synchronous=NORMAL). Cada modo usa su propia base
+temporal: varios hilos lectores hacen get_job (como el polling del navegador) y varios escritores
+renuevan leases y registran checkpoints (como los workers) durante unos segundos. Reporta ops/s de
+lectura, de escritura y las operaciones que fallaron con "database is locked".
+
+Uso:
+    python -m benchmarks.job_store_connections --readers 8 --writers 4 --seconds 5
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from video_translator.models import job as job_model
+from video_translator.models.job import JobTarget
+
+CURRENT_GET_DB = job_model.get_db
+
+
+@contextmanager
+def legacy_get_db():
+    """get_db previo al cambio: abre y cierra una conexión en cada llamada."""
+    conn = sqlite3.connect(str(job_model.DB_PATH), timeout=10.0)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _run_mode(label: str, get_db, readers: int, writers: int, seconds: float, jobs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        job_model.DB_PATH = Path(tmp_dir) / "bench_jobs.db"
+        job_model.get_db = get_db
+        try:
+            job_model.init_db()
+            job_ids = [job_model.create_job(f"bench-{index}.mp4", JobTarget.ANY) for index in range(jobs)]
+            for job_id in job_ids:
+                job_model.claim_job(job_id, "bench-worker")
+            with get_db() as conn:
+                journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+            counts = {"read": 0, "write": 0, "locked": 0}
+            lock = threading.Lock()
+            stop = threading.Event()
+            start = threading.Barrier(readers + writers + 1)
+
+            def reader(index: int) -> None:
+                done = locked = 0
+                start.wait()
+                while not stop.is_set():
+                    try:
+                        job_model.get_job(job_ids[(index + done) % len(job_ids)])
+                        done += 1
+                    except sqlite3.OperationalError:
+                        locked += 1
+                with lock:
+                    counts["read"] += done
+                    counts["locked"] += locked
+                job_model.close_db()
+
+            def writer(index: int) -> None:
+                done = locked = 0
+                start.wait()
+                while not stop.is_set():
+                    job_id = job_ids[(index + done) % len(job_ids)]
+                    try:
+                        if done % 2:
+                            job_model.update_job_checkpoint(job_id, None, "transcribe")
+                        else:
+                            job_model.renew_job_lease(job_id, "bench-worker")
+                        done += 1
+                    except sqlite3.OperationalError:
+                        locked += 1
+                with lock:
+                    counts["write"] += done
+                    counts["locked"] += locked
+                job_model.close_db()
+
+            threads = [threading.Thread(target=reader, args=(index,)) for index in range(readers)]
+            threads += [threading.Thread(target=writer, args=(index,)) for index in range(writers)]
+            for thread in threads:
+                thread.start()
+            start.wait()
+            time.sleep(seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            job_model.close_db()
+        finally:
+            job_model.get_db = CURRENT_GET_DB
+
+    total = counts["read"] + counts["write"]
+    print(f"🗄️  {label} (journal_mode={journal_mode})")
+    print(f"   {total / seconds:,.0f} ops/s: {counts['read'] / seconds:,.0f} lecturas/s, "
+          f"{counts['write'] / seconds:,.0f} escrituras/s, {counts['locked']} bloqueadas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de conexiones del job store")
+    parser.add_argument("--readers", type=int, default=8, help="Hilos haciendo get_job")
+    parser.add_argument("--writers", type=int, default=4, help="Hilos renovando leases y checkpoints")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duración de cada modo")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs en processing sobre los que operar")
+    args = parser.parse_args()
+
+    _run_mode("Conexión por llamada", legacy_get_db, args.readers, args.writers, args.seconds, args.jobs)
+    _run_mode("Conexión por hilo + WAL", CURRENT_GET_DB, args.readers, args.writers, args.seconds, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark del ensamblado final: replace_audio anterior vs actual.
+
+Compara el tiempo de muxeo y el tiempo hasta el primer frame en descarga progresiva. Este último se
+mide buscando (búsqueda binaria) el prefijo más corto del archivo del que ffmpeg puede decodificar
+el primer frame de video, y se convierte a segundos con el ancho de banda indicado. Sin +faststart
+el moov queda al final y hace falta el archivo completo.
+
+Sin --video/--audio se generan un clip de prueba H.264 + AAC y un MP3 como el de edge-tts
+(24 kHz mono, 48 kbps).
+
+Uso:
+    python -m benchmarks.mux_faststart --duration 120 --bandwidth-mbps 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from video_translator.services.media_service import replace_audio
+from video_translator.utils.shared.ffmpeg_runner import FFmpegError, run_ffmpeg
+
+
+async def replace_audio_previous(video_path: str, audio_path: str, output_video: str) -> None:
+    """replace_audio antes del cambio: solo -c:v copy (el audio se recodifica) y moov al final."""
+    await run_ffmpeg(
+        ["-y", "-i", video_path, "-i", audio_path, "-c:v", "copy", "-map", "0:v:0", "-map", "1:a:0", output_video],
+        error_message="Error al reemplazar audio",
+    )
+
+
+async def make_inputs(work_dir: str, duration: float) -> tuple[str, str]:
+    video_path = os.path.join(work_dir, "input.mp4")
+    audio_path = os.path.join(work_dir, "tts.mp3")
+    await run_ffmpeg(
+        [
+            "-y",
+            "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={duration}",
+            "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={duration}",
+            "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-b:a", "128k",
+            video_path,
+        ],
+        error_message="Error generando el video de prueba",
+    )
+    await run_ffmpeg(
+        [
+            "-y",
+            "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=24000:duration={duration}",
+            "-ac", "1", "-c:a", "libmp3lame", "-b:a", "48k",
+            audio_path,
+        ],
+        error_message="Error generando el audio de prueba",
+    )
+    return video_path, audio_path
+
+
+async def _decodes_first_frame(path: str) -> bool:
+    try:
+        # Un frame reducido a 16x16 en gris: hay salida solo si el primer frame se pudo decodificar
+        frame = await run_ffmpeg(
+            [
+                "-v", "error",
+                "-i", path,
+                "-frames:v", "1",
+                "-vf", "scale=16:16",
+                "-pix_fmt", "gray",
+                "-f", "rawvideo", "pipe:1",
+            ],
+            capture_stdout=True,
+        )
+    except FFmpegError:
+        return False
+    return bool(frame)
+
+
+async def bytes_to_first_frame(path: str, work_dir: str) -> int:
+    """Prefijo mínimo del archivo con el que ya se puede mostrar el primer frame."""
+    with open(path, "rb") as f:
+        data = f.read()
+    prefix_path = os.path.join(work_dir, "prefix.mp4")
+
+    async def decodes(size: int) -> bool:
+        with open(prefix_path, "wb") as prefix:
+            prefix.write(data[:size])
+        return await _decodes_first_frame(prefix_path)
+
+    low, high = 0, len(data)
+    while high - low > 1024:
+        middle = (low + high) // 2
+        if await decodes(middle):
+            high = middle
+        else:
+            low = middle
+    os.remove(prefix_path)
+    return high
+
+
+async def measure(mux, video_path: str, audio_path: str, work_dir: str, name: str, repeats: int) -> dict:
+    output_path = os.path.join(work_dir, f"{name}.mp4")
+    timings: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await mux(video_path, audio_path, output_path)
+        timings.append(time.perf_counter() - started)
+    return {
+        "mux_seconds": statistics.median(timings),
+        "size": os.path.getsize(output_path),
+        "first_frame_bytes": await bytes_to_first_frame(output_path, work_dir),
+    }
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.video and args.audio:
+            video_path, audio_path = args.video, args.audio
+        else:
+            print(f"🎬 Generando entradas de prueba de {args.duration:g}s...")
+            video_path, audio_path = await make_inputs(work_dir, args.duration)
+
+        bytes_per_second = args.bandwidth_mbps * 1_000_000 / 8
+        for name, mux in (("anterior", replace_audio_previous), ("actual", replace_audio)):
+            result = await measure(mux, video_path, audio_path, work_dir, name, args.repeats)
+            first_frame_seconds = result["first_frame_bytes"] / bytes_per_second
+            print(
+                f"⏱️  {name:>8}: mux {result['mux_seconds']:6.2f}s | {result['size'] / 1e6:7.1f} MB | "
+                f"primer frame tras {result['first_frame_bytes'] / 1e6:7.2f} MB "
+                f"= {first_frame_seconds:6.2f}s a {args.bandwidth_mbps:g} Mbps"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de muxeo y de primer frame de replace_audio")
+    parser.add_argument("--video", help="Video de entrada (por defecto se genera uno)")
+    parser.add_argument("--audio", help="Audio TTS en MP3 (por defecto se genera uno)")
+    parser.add_argument("--duration", type=float, default=120.0, help="Duración de las entradas generadas")
+    parser.add_argument("--bandwidth-mbps", type=float, default=10.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark del factor de tiempo real (RTF) de Whisper: decodificación secuencial vs por lotes.
+
+RTF = segundos de cómputo / segundos de audio (menor es mejor). Cada modo se mide tras calentar
+el modelo y sin la caché de artefactos, tomando la mediana de varias repeticiones.
+
+Por defecto el audio se genera con ffmpeg (lavfi, como el resto de benchmarks): "sílabas" armónicas
+con vibrato y una pausa de 1 s cada 6 s, así el VAD encuentra tramos que decodificar y la medida es
+reproducible sin material externo. `--audio` permite medir con un clip real.
+
+Uso:
+    python -m benchmarks.whisper_rtf --duration 120 --batch-sizes 4,8,16 --repeats 3
+    python -m benchmarks.whisper_rtf --audio clip.mp4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+from faster_whisper import decode_audio
+
+from video_translator.services import transcription_service
+from video_translator.services.transcription_service import WHISPER_SAMPLE_RATE
+from video_translator.utils.shared.ffmpeg_runner import run_ffmpeg
+
+# Envolvente de 4 sílabas/s, pausa en el último segundo de cada 6, tono de ~140 Hz con armónicos y un "formante" móvil
+SYNTHETIC_SPEECH = (
+    "aevalsrc='lt(mod(t,6),5)*(0.5-0.5*cos(2*PI*4*t))*("
+    "0.5*sin(2*PI*140*t+3*sin(2*PI*3*t))"
+    "+0.3*sin(2*PI*280*t+6*sin(2*PI*3*t))"
+    "+0.15*sin(2*PI*(700+200*sin(2*PI*0.7*t))*t))'"
+    ":s={rate}:d={duration}"
+)
+
+
+def synthetic_audio(duration: float) -> np.ndarray:
+    """PCM float32 mono de 16 kHz generado con ffmpeg, el mismo en cada ejecución."""
+    pcm = asyncio.run(
+        run_ffmpeg(
+            [
+                "-f", "lavfi", "-i", SYNTHETIC_SPEECH.format(rate=WHISPER_SAMPLE_RATE, duration=duration),
+                "-f", "s16le", "-ac", "1", "pipe:1",
+            ],
+            capture_stdout=True,
+            error_message="Error generando el audio sintético",
+        )
+    )
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def measure(audio, batch_size: int, repeats: int) -> tuple[float, int]:
+    """Mediana de segundos por transcripción completa y número de segmentos producidos."""
+    transcription_service.WHISPER_BATCH_SIZE = batch_size
+    timings: list[float] = []
+    segments = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        segments = sum(1 for _text in transcription_service._decode_segments(audio))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RTF de Whisper en modo secuencial y por lotes")
+    parser.add_argument("--audio", help="Video o audio real en lugar del sintético (se decodifica a PCM de 16 kHz)")
+    parser.add_argument("--duration", type=float, default=120.0, help="Segundos de audio sintético")
+    parser.add_argument("--batch-sizes", default="4,8,16", help="Tamaños de lote a comparar con el modo secuencial")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.audio:
+        audio = decode_audio(args.audio, sampling_rate=WHISPER_SAMPLE_RATE)
+    else:
+        audio = synthetic_audio(args.duration)
+    audio_seconds = len(audio) / WHISPER_SAMPLE_RATE
+    source = args.audio or "audio sintético"
+    print(f"🎧 {source}: {audio_seconds:.1f}s de audio, modelo {transcription_service.WHISPER_MODEL_NAME}")
+
+    transcription_service.warm_up_model()
+
+    modes = [0] + [int(size) for size in args.batch_sizes.split(",") if int(size) > 1]
+    baseline = None
+    for batch_size in modes:
+        seconds, segments = measure(audio, batch_size, args.repeats)
+        baseline = baseline or seconds
+        label = "secuencial" if batch_size == 0 else f"lotes de {batch_size}"
+        print(
+            f"⏱️  {label:>12}: {seconds:7.2f}s  RTF {seconds / audio_seconds:.3f}  "
+            f"x{baseline / seconds:.2f} vs secuencial  ({segments} segmentos)"
+        )
+        if segments == 0:
+            print("⚠️  El VAD no encontró voz: el tiempo medido no incluye decodificación (prueba con --audio)")
+
+
+if __name__ == "__main__":
+    main()
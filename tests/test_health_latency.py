@@ -0,0 +1,75 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from video_translator.controllers.web_controller import web_router
+from video_translator.utils.shared.video_pipeline import process_video_pipeline
+
+# Cada etapa bloquea su hilo como lo harían ffmpeg, Whisper o una petición HTTP síncrona
+STAGE_SECONDS = 0.3
+
+
+def _blocking_stage(result=None):
+    def stage(*_args):
+        time.sleep(STAGE_SECONDS)
+        return result
+
+    return stage
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(web_router)
+
+    @app.post("/job")
+    async def run_job():
+        await process_video_pipeline(
+            "input.mp4",
+            "output.mp4",
+            _blocking_stage(),
+            _blocking_stage("hello world"),
+            _blocking_stage("hola mundo"),
+            _blocking_stage(),
+            _blocking_stage(),
+            streaming=False,
+            stream_mux=False,
+        )
+        return {"status": "done"}
+
+    return app
+
+
+async def _health_latencies() -> tuple[list[float], list[float]]:
+    # ASGITransport ejecuta la app en este mismo event loop: una etapa que lo bloquee congelaría /health
+    transport = httpx.ASGITransport(app=_build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def health() -> float:
+            started = time.perf_counter()
+            response = await client.get("/health")
+            assert response.status_code == 200
+            return time.perf_counter() - started
+
+        idle = [await health() for _ in range(5)]
+
+        job = asyncio.create_task(client.post("/job"))
+        await asyncio.sleep(0.05)
+        during: list[float] = []
+        while not job.done():
+            during.append(await health())
+            await asyncio.sleep(0.02)
+
+        assert (await job).json() == {"status": "done"}
+    return idle, during
+
+
+def test_health_latency_stays_flat_while_job_runs():
+    idle, during = asyncio.run(_health_latencies())
+
+    # Cinco etapas de 0.3 s dan tiempo para muchas consultas si el event loop sigue libre
+    assert len(during) >= 20
+    assert max(during) < STAGE_SECONDS / 3
+    assert statistics.median(during) < statistics.median(idle) + 0.05
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from video_translator.services import transcription_service
+from video_translator.services.transcription_service import (
+    WHISPER_SAMPLE_RATE,
+    _merge_spans,
+    _split_at_silence,
+    _transcribe_parallel,
+    _trim_repeated_prefix,
+    transcribe_span_local,
+)
+from video_translator.services.whisper_pool import WhisperPool
+
+BURST_SECONDS = 2.0
+GAP_SECONDS = 1.0
+
+
+def _bursts_audio(count: int) -> tuple[np.ndarray, list[tuple[float, float]]]:
+    """Audio sintético: `count` tonos separados por silencio. El tono k tiene amplitud 0.1 * (k + 1).
+
+    Retorna el PCM y los intervalos (inicio, fin) en segundos de cada silencio entre tonos.
+    """
+    burst = int(BURST_SECONDS * WHISPER_SAMPLE_RATE)
+    gap = int(GAP_SECONDS * WHISPER_SAMPLE_RATE)
+    # Onda cuadrada: sin cruces por cero, así el falso Whisper ve cada tono como un solo bloque
+    tone = np.sign(np.sin(2 * np.pi * 440 * (np.arange(burst) + 0.5) / WHISPER_SAMPLE_RATE)).astype(np.float32)
+    parts: list[np.ndarray] = []
+    silences: list[tuple[float, float]] = []
+    for index in range(count):
+        parts.append(tone * 0.1 * (index + 1))
+        start = sum(len(part) for part in parts) / WHISPER_SAMPLE_RATE
+        parts.append(np.zeros(gap, dtype=np.float32))
+        silences.append((start, start + GAP_SECONDS))
+    return np.concatenate(parts), silences[:-1]
+
+
+def _fake_whisper(audio: np.ndarray) -> list[SimpleNamespace]:
+    """Un segmento por tono, con marcas de tiempo relativas al tramo y la palabra que codifica su amplitud."""
+    loud = np.abs(audio) > 1e-3
+    segments: list[SimpleNamespace] = []
+    start = None
+    for index, is_loud in enumerate(np.append(loud, False)):
+        if is_loud and start is None:
+            start = index
+        elif not is_loud and start is not None:
+            word = f"palabra{round(np.abs(audio[start:index]).max() * 10) - 1}"
+            segments.append(
+                SimpleNamespace(start=start / WHISPER_SAMPLE_RATE, end=index / WHISPER_SAMPLE_RATE, text=f" {word} ")
+            )
+            start = None
+    return segments
+
+
+@pytest.mark.parametrize("spans", [2, 3, 5])
+def test_split_cuts_inside_silences(spans):
+    audio, silences = _bursts_audio(10)
+    ranges = _split_at_silence(audio, spans)
+
+    assert len(ranges) == spans
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(audio)
+    for (_start, end), (next_start, _end) in zip(ranges, ranges[1:]):
+        assert end == next_start
+        cut_seconds = end / WHISPER_SAMPLE_RATE
+        assert any(low <= cut_seconds <= high for low, high in silences), cut_seconds
+
+
+def test_split_of_pure_silence_keeps_contiguous_spans():
+    audio = np.zeros(90 * WHISPER_SAMPLE_RATE, dtype=np.float32)
+    ranges = _split_at_silence(audio, 3)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(audio)
+    assert all(end == next_start for (_s, end), (next_start, _e) in zip(ranges, ranges[1:]))
+    assert all(start < end for start, end in ranges)
+
+
+def test_span_segments_are_shifted_by_the_span_offset(monkeypatch):
+    segments = [
+        SimpleNamespace(start=0.5, end=1.5, text=" hello "),
+        SimpleNamespace(start=1.5, end=2.0, text="   "),
+        SimpleNamespace(start=2.0, end=3.0, text="world"),
+    ]
+    monkeypatch.setattr(transcription_service, "_run_whisper", lambda _audio: segments)
+
+    assert transcribe_span_local(np.zeros(10, dtype=np.float32), 30.0) == [
+        (30.5, 31.5, "hello"),
+        (32.0, 33.0, "world"),
+    ]
+
+
+def test_trim_repeated_prefix_ignores_case_and_punctuation():
+    assert _trim_repeated_prefix("and then we went home.", "Went home, and slept") == "and slept"
+    assert _trim_repeated_prefix("we went home", "home") == ""
+    assert _trim_repeated_prefix("we went home", "nothing repeated here") == "nothing repeated here"
+
+
+def test_merge_removes_duplicated_prefix_at_span_boundary():
+    spans = [
+        [(0.0, 4.0, "the quick brown fox"), (4.0, 10.2, "jumps over the")],
+        # El segundo tramo empieza 0.3 s antes del corte y repite "over the"
+        [(9.7, 12.0, "over the lazy dog"), (12.0, 14.0, "and runs away")],
+    ]
+
+    assert _merge_spans(spans) == ["the quick brown fox", "jumps over the", "lazy dog", "and runs away"]
+
+
+def test_merge_drops_segments_fully_repeated_in_the_overlap():
+    spans = [[(0.0, 10.2, "hello there")], [(9.9, 10.2, "there"), (10.2, 12.0, "general kenobi")]]
+
+    assert _merge_spans(spans) == ["hello there", "general kenobi"]
+
+
+def test_merge_keeps_repeated_words_outside_the_overlap():
+    # Empieza después del final del segmento anterior: la repetición es real, no del solape
+    spans = [[(0.0, 5.0, "no no")], [(5.5, 7.0, "no no no")]]
+
+    assert _merge_spans(spans) == ["no no", "no no no"]
+
+
+def test_parallel_transcription_keeps_order_and_offsets(monkeypatch):
+    audio, _silences = _bursts_audio(12)
+    shifted: list[list[tuple[float, float, str]]] = []
+
+    def span_local(span_audio: np.ndarray, offset_seconds: float):
+        segments = transcribe_span_local(span_audio, offset_seconds)
+        shifted.append(segments)
+        return segments
+
+    monkeypatch.setattr(transcription_service, "_run_whisper", _fake_whisper)
+    monkeypatch.setattr(transcription_service, "transcribe_span_local", span_local)
+    monkeypatch.setattr(transcription_service, "get_artifact_cache", lambda: None)
+    monkeypatch.setattr(transcription_service, "get_whisper_pool", lambda: WhisperPool(0, 1))
+
+    text = asyncio.run(_transcribe_parallel(audio, 4))
+
+    assert text.split("\n") == [f"palabra{index}" for index in range(12)]
+    # Cada segmento cae dentro de su tono en el audio original, sea cual sea el tramo que lo transcribió
+    period = BURST_SECONDS + GAP_SECONDS
+    all_segments = [segment for segments in shifted for segment in segments]
+    for start, end, word in all_segments:
+        tone_start = int(word.removeprefix("palabra")) * period
+        assert tone_start - 1e-3 <= start < end <= tone_start + BURST_SECONDS + 1e-3
+    # El solape hizo que algún tono apareciera en dos tramos y el merge lo dejó una sola vez
+    assert len(all_segments) > 12
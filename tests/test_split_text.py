@@ -0,0 +1,98 @@
+import random
+import time
+
+import pytest
+
+from video_translator.utils.text import pack_sentences, split_sentences, split_text
+
+WORDS = ["the", "video", "model", "a", "translation", "is", "fast", "I", "don't", "think", "so", "(really)"]
+ENDINGS = [".", "!", "?", "…", '."', ".)"]
+
+
+def _random_segments(rng: random.Random, max_word_length: int = 30) -> list[str]:
+    """Segmentos de Whisper aleatorios: oraciones de longitud variable, a veces partidas entre segmentos.
+
+    Ninguna palabra (con su puntuación) supera `max_word_length` caracteres.
+    """
+    segments: list[str] = []
+    for _ in range(rng.randint(0, 40)):
+        words: list[str] = []
+        for _ in range(rng.randint(1, 60)):
+            if rng.random() < 0.05:
+                word = "x" * rng.randint(1, max_word_length - 2)
+            else:
+                word = rng.choice(WORDS)
+            if rng.random() < 0.15:
+                word += rng.choice(ENDINGS)
+            words.append(word)
+        separator = rng.choice([" ", "  ", "\t"])
+        segments.append(separator.join(words))
+    return segments
+
+
+def _seeds():
+    return range(150)
+
+
+@pytest.mark.parametrize("max_length", [20, 80, 500])
+def test_chunks_never_exceed_max_length(max_length):
+    for seed in _seeds():
+        rng = random.Random(seed)
+        text = "\n".join(_random_segments(rng, max_word_length=max_length * 2))
+        assert all(0 < len(chunk) <= max_length for chunk in split_text(text, max_length))
+
+
+@pytest.mark.parametrize("max_length", [40, 80, 500])
+def test_joining_chunks_round_trips_the_text(max_length):
+    for seed in _seeds():
+        rng = random.Random(seed)
+        segments = _random_segments(rng, max_word_length=max_length)
+        text = "\n".join(segments)
+        expected = " ".join(text.split())
+        assert " ".join(split_text(text, max_length)) == expected
+        # Texto y lista de segmentos son entradas equivalentes
+        assert split_text(segments, max_length) == split_text(text, max_length)
+
+
+@pytest.mark.parametrize("max_length", [40, 80, 500])
+def test_sentences_that_fit_are_never_cut(max_length):
+    for seed in _seeds():
+        rng = random.Random(seed)
+        text = "\n".join(_random_segments(rng, max_word_length=max_length))
+        chunks = split_text(text, max_length)
+        for sentence in split_sentences(text):
+            if len(sentence) <= max_length:
+                assert any(sentence in chunk for chunk in chunks), sentence
+
+
+@pytest.mark.parametrize("max_length", [40, 80, 500])
+def test_packing_is_greedy(max_length):
+    """Ningún lote podía haber admitido la primera oración del siguiente: mínimo de peticiones."""
+    for seed in _seeds():
+        rng = random.Random(seed)
+        sentences = split_sentences(_random_segments(rng, max_word_length=max_length))
+        batches = pack_sentences(sentences, max_length)
+        for batch, following in zip(batches, batches[1:]):
+            assert len(" ".join(batch)) + 1 + len(following[0]) > max_length
+
+
+def test_same_sentences_give_same_chunks():
+    segments = ["Hello there. How are you?", "I am fine, thanks.", "See you tomorrow!"]
+    assert split_text(segments, 30) == split_text("\n".join(segments), 30)
+    assert split_text(segments, 30) == ["Hello there. How are you?", "I am fine, thanks.", "See you tomorrow!"]
+
+
+def test_linear_time_on_long_transcripts():
+    rng = random.Random(0)
+    segment = " ".join(rng.choice(WORDS) + rng.choice(["", "."]) for _ in range(20))
+    small = "\n".join([segment] * 2_000)
+    large = "\n".join([segment] * 20_000)
+
+    def elapsed(text: str) -> float:
+        started = time.perf_counter()
+        split_text(text, 500)
+        return time.perf_counter() - started
+
+    elapsed(small)
+    # 10 veces más texto no debería costar mucho más de 10 veces más (margen para el ruido)
+    assert elapsed(large) < 30 * max(elapsed(small), 1e-3)
@@ -0,0 +1,59 @@
+import asyncio
+import random
+
+import pytest
+
+from video_translator.services import google_translate_client
+from video_translator.services.google_translate_client import GoogleTranslateClient, TranslationRequestError
+from video_translator.stubs.translation_server import StubTranslationServer
+
+TEXTS = [f"sentence number {index}" for index in range(20)]
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(google_translate_client, "RETRY_BASE_SECONDS", 0.001)
+
+
+async def _translate(stub: StubTranslationServer, texts: list[str], **client_options) -> list[str]:
+    server = await stub.start()
+    host, port = server.sockets[0].getsockname()[:2]
+    client = GoogleTranslateClient("en", "es", base_url=f"http://{host}:{port}/translate_a/single", **client_options)
+    try:
+        async with server:
+            return await client.translate_many(texts)
+    finally:
+        await client._get_client().aclose()
+
+
+def test_retries_each_failed_attempt_and_keeps_order():
+    stub = StubTranslationServer(latency=0.01, fail_first=2)
+
+    translated = asyncio.run(_translate(stub, TEXTS, concurrency=4, retries=3))
+
+    assert translated == [f"[es] {text}" for text in TEXTS]
+    assert stub.failures == 2 * len(TEXTS)
+    assert stub.requests == 3 * len(TEXTS)
+    assert all(attempts == 3 for attempts in stub.attempts_by_text.values())
+
+
+def test_random_failures_keep_order_and_respect_concurrency():
+    random.seed(7)
+    # Los textos que fallan se reintentan y terminan después que los siguientes: llegan desordenados
+    stub = StubTranslationServer(latency=0.02, failure_rate=0.3)
+
+    translated = asyncio.run(_translate(stub, TEXTS, concurrency=4, retries=20))
+
+    assert translated == [f"[es] {text}" for text in TEXTS]
+    assert stub.failures > 0
+    # Cada fallo se reintentó exactamente una vez más; ninguna traducción correcta se repitió
+    assert stub.requests == len(TEXTS) + stub.failures
+    assert 1 < stub.max_in_flight <= 4
+
+
+def test_gives_up_after_the_configured_retries():
+    stub = StubTranslationServer(latency=0.0, fail_first=3)
+
+    with pytest.raises(TranslationRequestError, match="3 intentos"):
+        asyncio.run(_translate(stub, TEXTS[:1], retries=2))
+    assert stub.requests == 3
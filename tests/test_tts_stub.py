@@ -0,0 +1,92 @@
+import asyncio
+import random
+import shutil
+
+import pytest
+
+from video_translator.services import tts_service
+from video_translator.stubs.tts_server import StubTTSServer
+from video_translator.utils.shared.ffmpeg_runner import run_ffmpeg
+from video_translator.utils.text import normalize_sentence
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="el stub genera el MP3 con ffmpeg")
+
+# Longitudes distintas: cada oración produce un MP3 de duración (y bytes) diferente
+SENTENCES = [f"Esta es la oración {index}{' con relleno' * index}." for index in range(8)]
+TEXT = " ".join(SENTENCES)
+SAMPLE_RATE = 24000
+
+
+@pytest.fixture(autouse=True)
+def tts_config(monkeypatch):
+    monkeypatch.setattr(tts_service, "get_artifact_cache", lambda: None)
+    monkeypatch.setattr(tts_service, "RETRY_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(tts_service, "TTS_CONCURRENCY", 3)
+
+
+async def _with_stub(stub: StubTTSServer, monkeypatch, work):
+    server = await stub.start()
+    host, port = server.sockets[0].getsockname()[:2]
+    monkeypatch.setattr(tts_service, "TTS_SERVER_URL", f"http://{host}:{port}/synthesize")
+    async with server:
+        return await work()
+
+
+async def _decoded_seconds(path: str) -> float:
+    pcm = await run_ffmpeg(
+        ["-i", path, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"], capture_stdout=True
+    )
+    return len(pcm) / 2 / SAMPLE_RATE
+
+
+async def _decoded_seconds_of(stub: StubTTSServer, sentence: str, tmp_path) -> float:
+    path = tmp_path / f"piece_{len(sentence)}.mp3"
+    path.write_bytes(await stub._silence(normalize_sentence(sentence)))
+    return await _decoded_seconds(str(path))
+
+
+def test_stream_retries_each_piece_and_keeps_order(monkeypatch):
+    stub = StubTTSServer(latency=0.01, fail_first=2)
+
+    async def work():
+        chunks = [chunk async for chunk in tts_service.stream_audio(TEXT)]
+        expected = [await stub._silence(normalize_sentence(sentence)) for sentence in SENTENCES]
+        return chunks, expected
+
+    chunks, expected = asyncio.run(_with_stub(stub, monkeypatch, work))
+
+    assert chunks == expected
+    assert len(stub.attempts_by_text) == len(SENTENCES)
+    assert all(attempts == 3 for attempts in stub.attempts_by_text.values())
+    assert stub.failures == 2 * len(SENTENCES)
+    assert 1 < stub.max_in_flight <= 3
+
+
+def test_generate_audio_concatenates_every_piece(monkeypatch, tmp_path):
+    random.seed(3)
+    # Los fragmentos que fallan terminan después que los siguientes; la concatenación sigue en orden
+    stub = StubTTSServer(latency=0.01, failure_rate=0.3)
+    monkeypatch.setattr(tts_service, "TTS_RETRIES", 20)
+    output = str(tmp_path / "tts.mp3")
+
+    async def work():
+        await tts_service.generate_audio(TEXT, output)
+        pieces = [await _decoded_seconds_of(stub, sentence, tmp_path) for sentence in SENTENCES]
+        return await _decoded_seconds(output), sum(pieces)
+
+    total, expected = asyncio.run(_with_stub(stub, monkeypatch, work))
+
+    assert stub.failures > 0
+    assert stub.requests == len(SENTENCES) + stub.failures
+    # Cada pieza MP3 arrastra unos milisegundos de relleno del codificador
+    assert total == pytest.approx(expected, abs=0.1)
+
+
+def test_piece_that_exhausts_its_retries_fails_the_whole_audio(monkeypatch, tmp_path):
+    stub = StubTTSServer(latency=0.0, fail_first=10)
+    monkeypatch.setattr(tts_service, "TTS_RETRIES", 1)
+
+    with pytest.raises(RuntimeError, match="tras 2 intentos"):
+        asyncio.run(_with_stub(stub, monkeypatch, lambda: tts_service.generate_audio(TEXT, str(tmp_path / "tts.mp3"))))
+    assert not (tmp_path / "tts.mp3").exists()
+
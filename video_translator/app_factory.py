@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -7,10 +9,27 @@ from video_translator.controllers.jobs_controller import jobs_router
 from video_translator.controllers.upload_controller import upload_router
 from video_translator.controllers.web_controller import web_router
 from video_translator.models.job import init_db
+from video_translator.services.whisper_pool import shutdown_whisper_pool, start_background_preload
+from video_translator.utils.jobs_controller import sweep_expired_leases
+from video_translator.utils.shared.executors import shutdown_executors
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # El modelo se calienta en segundo plano; /ready indica cuándo se puede enrutar tráfico
+    start_background_preload()
+    # Los jobs de workers caídos vuelven a la cola cuando vence su lease
+    sweeper = asyncio.create_task(sweep_expired_leases())
+    yield
+    sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await sweeper
+    shutdown_whisper_pool()
+    shutdown_executors()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Traductor de Videos")
+    app = FastAPI(title="Traductor de Videos", lifespan=lifespan)
 
     project_root = Path(__file__).resolve().parents[1]
     static_dir = project_root / "static"
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from video_translator.services.whisper_pool import CPU_COUNT
+
+
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".mov", ".webm", ".avi", ".m4v"}
+OUTPUT_SUFFIX = "_es.mp4"
+
+
+def collect_inputs(source: str) -> list[Path]:
+    """Lista los videos de un directorio o de un manifiesto (una ruta por línea o lista JSON)."""
+    source_path = Path(source)
+    if source_path.is_dir():
+        return sorted(
+            path
+            for path in source_path.rglob("*")
+            if path.is_file()
+            and path.suffix.lower() in VIDEO_EXTENSIONS
+            and not path.name.endswith(OUTPUT_SUFFIX)
+            and not path.name.startswith(".")
+        )
+
+    content = source_path.read_text(encoding="utf-8")
+    if source_path.suffix.lower() == ".json":
+        entries = json.loads(content)
+    else:
+        entries = [line.strip() for line in content.splitlines() if line.strip() and not line.startswith("#")]
+    base_dir = source_path.parent
+    return [path if path.is_absolute() else base_dir / path for path in map(Path, entries)]
+
+
+def output_path_for(input_path: Path, output_dir: Path, input_root: Path) -> Path:
+    """Refleja bajo output_dir la carpeta del video relativa a input_root, para que a/intro.mp4 y
+    b/intro.mp4 no escriban el mismo archivo."""
+    relative_dir = input_path.parent.relative_to(input_root)
+    return output_dir / relative_dir / f"{input_path.stem}{OUTPUT_SUFFIX}"
+
+
+def plan_outputs(
+    inputs: list[Path], output_dir: Path, input_root: Path | None = None
+) -> list[tuple[Path, Path]]:
+    """Asocia cada video (sin repetir) con su salida; falla si dos videos distintos irían al mismo archivo.
+
+    Sin input_root (manifiestos) se usa la carpeta común de todos los videos.
+    """
+    unique_inputs = list(dict.fromkeys(path.resolve() for path in inputs))
+    if not unique_inputs:
+        return []
+
+    if input_root is None:
+        input_root = Path(os.path.commonpath([path.parent for path in unique_inputs]))
+    else:
+        input_root = input_root.resolve()
+    plan = [(path, output_path_for(path, output_dir, input_root)) for path in unique_inputs]
+
+    sources_by_output: dict[Path, list[Path]] = {}
+    for input_path, output_path in plan:
+        sources_by_output.setdefault(output_path, []).append(input_path)
+    collisions = {output: sources for output, sources in sources_by_output.items() if len(sources) > 1}
+    if collisions:
+        details = "; ".join(
+            f"{output} <- {', '.join(str(source) for source in sources)}" for output, sources in collisions.items()
+        )
+        raise ValueError(f"Varios videos escribirían el mismo archivo de salida: {details}")
+    return plan
+
+
+def partial_path_for(output_path: Path) -> Path:
+    """Archivo oculto junto a la salida donde ffmpeg escribe; solo un video completo toma el nombre final."""
+    return output_path.with_name(f".{output_path.stem}.part{output_path.suffix}")
+
+
+def _init_batch_process(cpu_threads: int) -> None:
+    """Carga Whisper una sola vez por proceso; la transcripción corre dentro del propio proceso."""
+    from video_translator.services import transcription_service
+    from video_translator.services.whisper_pool import configure_whisper_pool
+
+    # Cada proceso del lote ya es una instancia del pool: sin pool anidado y con su parte de los núcleos
+    transcription_service.WHISPER_CPU_THREADS = cpu_threads
+    configure_whisper_pool(0, cpu_threads)
+    transcription_service._get_whisper_model()
+
+
+def _translate_file(input_path: str, output_path: str) -> dict:
+    return asyncio.run(_translate_file_async(input_path, output_path))
+
+
+async def _translate_file_async(input_path: str, output_path: str) -> dict:
+    from video_translator.services.media_service import (
+        extract_audio,
+        get_video_duration,
+        replace_audio,
+        replace_audio_stream,
+    )
+    from video_translator.services.transcription_service import transcribe_audio, transcribe_segments
+    from video_translator.services.translation_service import translate_text
+    from video_translator.services.tts_service import generate_audio, stream_audio
+    from video_translator.utils.shared.video_pipeline import process_video_pipeline
+
+    stage_seconds: dict[str, float] = {}
+    current_stage: str | None = None
+    stage_started = 0.0
+
+    def on_step(step: str, _payload: str | None) -> None:
+        nonlocal current_stage, stage_started
+        stage, _, event = step.partition(":")
+        if event not in ("start", "done"):
+            return
+        now = time.perf_counter()
+        if current_stage is not None:
+            stage_seconds[current_stage] = stage_seconds.get(current_stage, 0.0) + now - stage_started
+        current_stage = stage if event == "start" else None
+        stage_started = now
+
+    result: dict = {"input": input_path, "output": output_path, "stages": stage_seconds}
+    # Un Ctrl-C, kill u OOM deja a lo sumo este parcial; la siguiente corrida lo sobrescribe
+    partial_path = str(partial_path_for(Path(output_path)))
+    started = time.perf_counter()
+    try:
+        result["media_seconds"] = await get_video_duration(input_path)
+        await process_video_pipeline(
+            input_path,
+            partial_path,
+            extract_audio,
+            transcribe_audio,
+            translate_text,
+            generate_audio,
+            replace_audio,
+            on_step=on_step,
+            transcribe_segments=transcribe_segments,
+            stream_audio=stream_audio,
+            replace_audio_stream=replace_audio_stream,
+        )
+        os.replace(partial_path, output_path)
+        result["status"] = "completed"
+    except Exception as error:
+        result["status"] = "failed"
+        result["error"] = str(error)
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    result["wall_seconds"] = time.perf_counter() - started
+    return result
+
+
+def run_batch(inputs: list[Path], output_dir: Path, workers: int, input_root: Path | None = None) -> dict:
+    plan = plan_outputs(inputs, output_dir, input_root)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files: list[dict] = []
+    pending: list[tuple[Path, Path]] = []
+
+    for input_path, output_path in plan:
+        # La salida final solo existe si el video terminó (se renombra desde el parcial al completar)
+        if output_path.exists() and output_path.stat().st_size > 0:
+            files.append({"input": str(input_path), "output": str(output_path), "status": "skipped"})
+        else:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            pending.append((input_path, output_path))
+
+    print(f"📦 {len(plan)} videos, {len(pending)} por procesar con {workers} procesos")
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_process,
+        initargs=(max(1, CPU_COUNT // workers),),
+    ) as pool:
+        futures = {
+            pool.submit(_translate_file, str(input_path), str(output_path)): input_path
+            for input_path, output_path in pending
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            files.append(result)
+            icon = "✅" if result["status"] == "completed" else "❌"
+            print(f"{icon} {futures[future].name} ({result['wall_seconds']:.1f}s)")
+
+    wall_seconds = time.perf_counter() - started
+    completed = [entry for entry in files if entry["status"] == "completed"]
+    media_seconds = sum(entry.get("media_seconds", 0.0) for entry in completed)
+    wall_minutes = wall_seconds / 60
+
+    return {
+        "workers": workers,
+        "total": len(files),
+        "completed": len(completed),
+        "failed": sum(1 for entry in files if entry["status"] == "failed"),
+        "skipped": sum(1 for entry in files if entry["status"] == "skipped"),
+        "wall_seconds": wall_seconds,
+        "media_seconds": media_seconds,
+        # Minutos de video traducidos por minuto de reloj
+        "throughput": (media_seconds / 60) / wall_minutes if wall_minutes > 0 else 0.0,
+        "files": files,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Traducción por lotes de videos locales")
+    parser.add_argument("input", help="Directorio de videos o manifiesto (.txt con una ruta por línea o .json)")
+    parser.add_argument("--output-dir", required=True, help="Directorio donde escribir los videos traducidos")
+    parser.add_argument("--workers", type=int, default=CPU_COUNT, help="Número de procesos")
+    parser.add_argument("--report", default="batch_report.json", help="Ruta del reporte JSON")
+
+    args = parser.parse_args()
+
+    inputs = collect_inputs(args.input)
+    input_root = Path(args.input) if Path(args.input).is_dir() else None
+    try:
+        report = run_batch(inputs, Path(args.output_dir), max(1, args.workers), input_root)
+    except ValueError as error:
+        parser.error(str(error))
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(
+        f"\n📊 {report['completed']} completados, {report['failed']} fallidos, {report['skipped']} omitidos "
+        f"en {report['wall_seconds'] / 60:.1f} min"
+    )
+    print(f"⚡ Throughput: {report['throughput']:.2f} min de video por min de reloj")
+    print(f"📝 Reporte: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
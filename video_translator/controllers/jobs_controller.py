@@ -1,25 +1,48 @@
 import os
 import tempfile
+import uuid
 from pathlib import Path
 from typing import Optional
 import asyncio
 
-from fastapi import APIRouter, Depends, Header, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, UploadFile
 from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
 
-from video_translator.models.job import JobStatus, delete_job, dequeue_next_pending_job, get_job, update_job_status
-from video_translator.utils.jobs_controller import safe_remove, cleanup_job_files, process_job_on_render
+from video_translator.models.job import (
+    JobStatus,
+    delete_job,
+    dequeue_pending_jobs,
+    finish_job,
+    get_job,
+    renew_job_lease,
+    requeue_job,
+    update_job_checkpoint,
+)
+from video_translator.utils.jobs_controller import (
+    cleanup_job_files,
+    job_checkpoint_dir,
+    process_job_on_render,
+    safe_remove,
+    safe_remove_dir,
+)
+from video_translator.utils.shared.metrics import TRANSFERRED_BYTES
 
 jobs_router = APIRouter()
 
 # Token de autenticación para workers (debe estar en .env)
 WORKER_API_KEY = os.getenv("WORKER_API_KEY", "change-me-in-production")
 
+# Máximo de jobs que un worker puede reclamar en una sola llamada a /jobs/next
+JOBS_NEXT_MAX = int(os.getenv("JOBS_NEXT_MAX", "16"))
+
 # Directorio para resultados
 JOBS_DIR = Path(__file__).parent.parent.parent / "jobs_data"
 JOBS_DIR.mkdir(exist_ok=True)
 
+# Tareas de fallback en curso, para poder cancelarlas (y matar su ffmpeg) si se descarta el job
+_fallback_tasks: dict[str, asyncio.Task] = {}
+
 
 def verify_worker_token(x_api_key: str = Header(...)):
     """Verifica que el worker tenga un token válido."""
@@ -28,22 +51,27 @@ def verify_worker_token(x_api_key: str = Header(...)):
     return x_api_key
 
 
-@jobs_router.get("/jobs/next", dependencies=[Depends(verify_worker_token)])
-async def get_next_job(worker_id: str):
-    """Endpoint para que el worker obtenga y reclame el siguiente job pendiente."""
-    job = dequeue_next_pending_job(worker_id)
-    if not job:
-        return {"job": None}
-
+def _job_assignment(job: dict) -> dict:
     return {
-        "job": {
-            "id": job["id"],
-            "input_path": job["input_path"],
-            "created_at": job["created_at"],
-        }
+        "id": job["id"],
+        "input_path": job["input_path"],
+        "created_at": job["created_at"],
+        "checkpoint_dir": job.get("checkpoint_dir"),
+        "checkpoint_stage": job.get("checkpoint_stage"),
+        "translation_backend": job.get("translation_backend"),
     }
 
 
+@jobs_router.get("/jobs/next", dependencies=[Depends(verify_worker_token)])
+async def get_next_job(worker_id: str, max_jobs: int = Query(1, ge=1)):
+    """Endpoint para que el worker obtenga y reclame hasta `max_jobs` jobs pendientes en una transacción.
+
+    `job` conserva el formato anterior (el primero o None); `jobs` trae la lista completa.
+    """
+    jobs = [_job_assignment(job) for job in dequeue_pending_jobs(worker_id, min(max_jobs, JOBS_NEXT_MAX))]
+    return {"job": jobs[0] if jobs else None, "jobs": jobs}
+
+
 @jobs_router.get("/jobs/{job_id}")
 async def get_job_status(job_id: str):
     """Consulta el estado de un job."""
@@ -57,6 +85,8 @@ async def get_job_status(job_id: str):
         "created_at": job["created_at"],
         "updated_at": job["updated_at"],
         "error_message": job.get("error_message"),
+        "checkpoint_stage": job.get("checkpoint_stage"),
+        "attempts": job.get("attempts"),
     }
 
 
@@ -75,6 +105,7 @@ async def download_job_result(job_id: str):
         raise HTTPException(status_code=404, detail="Archivo de salida no encontrado")
 
     input_path = job.get("input_path")
+    TRANSFERRED_BYTES.inc(os.path.getsize(output_path), direction="download")
     return FileResponse(
         output_path,
         media_type="video/mp4",
@@ -94,6 +125,7 @@ async def download_job_input(job_id: str):
     if not input_path or not os.path.exists(input_path):
         raise HTTPException(status_code=404, detail="Archivo de entrada no encontrado")
 
+    TRANSFERRED_BYTES.inc(os.path.getsize(input_path), direction="download")
     return FileResponse(input_path, media_type="video/mp4", filename="input_video.mp4")
 
 
@@ -117,16 +149,58 @@ async def complete_job_endpoint(
     success: bool = True,
     error_message: Optional[str] = None,
 ):
-    """Permite a un worker marcar un job como completado o fallido."""
+    """Permite a un worker marcar un job como completado o fallido, si todavía tiene su lease."""
     status = JobStatus.COMPLETED if success else JobStatus.FAILED
-    update_job_status(job_id, status, output_path=output_path if success else None, error_message=error_message, worker_id=worker_id)
+    finished = finish_job(
+        job_id, worker_id, status, output_path=output_path if success else None, error_message=error_message
+    )
+    if not finished:
+        raise HTTPException(status_code=409, detail="El job ya no está asignado a este worker")
 
     return {"status": "updated"}
 
 
+@jobs_router.post("/jobs/{job_id}/checkpoint", dependencies=[Depends(verify_worker_token)])
+async def checkpoint_job_endpoint(job_id: str, worker_id: str, stage: str):
+    """Permite a un worker registrar la última etapa completada de un job.
+
+    Solo se guarda la etapa: los checkpoints viven en la máquina del worker.
+    """
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    if job.get("worker_id") != worker_id:
+        raise HTTPException(status_code=409, detail="El job pertenece a otro worker")
+
+    update_job_checkpoint(job_id, None, stage)
+    return {"status": "checkpointed", "stage": stage}
+
+
+@jobs_router.post("/jobs/{job_id}/heartbeat", dependencies=[Depends(verify_worker_token)])
+async def heartbeat_job_endpoint(job_id: str, worker_id: str):
+    """Renueva el lease de un job; si deja de llegar, el sweeper lo devuelve a la cola."""
+    if not renew_job_lease(job_id, worker_id):
+        raise HTTPException(status_code=409, detail="El job ya no está asignado a este worker")
+
+    return {"status": "renewed"}
+
+
+@jobs_router.post("/jobs/{job_id}/requeue")
+async def requeue_job_endpoint(job_id: str):
+    """Devuelve un job fallido a la cola para retomarlo desde su último checkpoint."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+
+    if not requeue_job(job_id):
+        raise HTTPException(status_code=400, detail="Solo se pueden reencolar jobs en estado failed")
+
+    return {"status": "requeued", "checkpoint_stage": job.get("checkpoint_stage")}
+
+
 @jobs_router.post("/jobs/{job_id}/upload-result", dependencies=[Depends(verify_worker_token)])
-async def upload_job_result(job_id: str, file: UploadFile):
-    """Permite al worker subir el video traducido."""
+async def upload_job_result(job_id: str, worker_id: str, file: UploadFile):
+    """Permite al worker que tiene el lease del job subir el video traducido."""
     job = get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job no encontrado")
@@ -134,24 +208,37 @@ async def upload_job_result(job_id: str, file: UploadFile):
     if job["status"] != JobStatus.PROCESSING:
         raise HTTPException(status_code=400, detail="El job no está en procesamiento")
 
-    # Guardar archivo
-    output_path = JOBS_DIR / f"{job_id}_output.mp4"
-    
+    if job.get("worker_id") != worker_id:
+        raise HTTPException(status_code=409, detail="El job ya no está asignado a este worker")
+
+    # Ruta propia de esta subida: si el lease pasó a otro worker, nunca se pisa ni borra su resultado
+    attempt = uuid.uuid4().hex
+    output_path = JOBS_DIR / f"{job_id}_output.{attempt}.mp4"
+    partial_path = JOBS_DIR / f"{job_id}_output.{attempt}.part"
+
     try:
-        with open(output_path, "wb") as f:
+        total_bytes = 0
+        with open(partial_path, "wb") as f:
             while chunk := await file.read(1024 * 1024):  # 1MB chunks
                 f.write(chunk)
-
-        # Actualizar job como completado
-        update_job_status(job_id, JobStatus.COMPLETED, output_path=str(output_path))
+                total_bytes += len(chunk)
+        TRANSFERRED_BYTES.inc(total_bytes, direction="upload")
+
+        # El archivo queda en su sitio antes de marcar el job: un polling nunca ve completed sin resultado
+        os.replace(partial_path, output_path)
+        if not finish_job(job_id, worker_id, JobStatus.COMPLETED, output_path=str(output_path)):
+            safe_remove(str(output_path))
+            raise HTTPException(status_code=409, detail="El job ya no está asignado a este worker")
         safe_remove(job.get("input_path"))
-        
+
         return {"status": "uploaded", "output_path": str(output_path)}
-    
+
+    except HTTPException:
+        raise
     except Exception as error:
-        if output_path and output_path.exists():
-            output_path.unlink()
         raise HTTPException(status_code=500, detail=f"Error al subir resultado: {error}") from error
+    finally:
+        safe_remove(str(partial_path))
 
 
 @jobs_router.post("/jobs/{job_id}/process-fallback")
@@ -182,18 +269,25 @@ async def process_job_fallback(job_id: str):
             "worker_id": current_job.get("worker_id") if current_job else None,
         }
 
-    asyncio.create_task(process_job_on_render(job_id))
+    task = asyncio.create_task(process_job_on_render(job_id))
+    _fallback_tasks[job_id] = task
+    task.add_done_callback(lambda _task: _fallback_tasks.pop(job_id, None))
     return {"status": "fallback_started", "worker_id": "render-fallback"}
 
 
 @jobs_router.post("/jobs/{job_id}/discard")
 async def discard_job(job_id: str):
     """Elimina archivos y metadatos de un job cuando el usuario abandona la página."""
+    task = _fallback_tasks.pop(job_id, None)
+    if task:
+        task.cancel()
+
     job = get_job(job_id)
     if not job:
         return {"status": "not_found"}
 
     safe_remove(job.get("input_path"))
     safe_remove(job.get("output_path"))
+    safe_remove_dir(job_checkpoint_dir(job_id))
     delete_job(job_id)
     return {"status": "discarded"}
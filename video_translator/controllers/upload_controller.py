@@ -1,15 +1,19 @@
 import os
 import tempfile
 from pathlib import Path
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Query, Request, UploadFile
 from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
 
 from video_translator.models.job import JobTarget, create_job
-from video_translator.services.media_service import extract_audio, get_video_duration, replace_audio
-from video_translator.services.transcription_service import transcribe_audio
+from video_translator.services.media_service import extract_audio, get_video_duration, replace_audio, replace_audio_stream
+from video_translator.services.transcription_service import transcribe_audio, transcribe_segments
+from video_translator.services.translation_backends import is_translation_backend
 from video_translator.services.translation_service import translate_text
-from video_translator.services.tts_service import generate_audio
+from video_translator.services.tts_service import generate_audio, stream_audio
+from video_translator.utils.shared.executors import run_io_bound
+from video_translator.utils.shared.metrics import TRANSFERRED_BYTES
 from video_translator.utils.worker.process_video import process_video
 from video_translator.utils.worker.validate_video_duration import validate_video_duration
 from video_translator.utils.worker.ip_utils import enforce_ip_limit
@@ -47,8 +51,9 @@ async def upload_video(file: UploadFile, request: Request):
             temp_video.write(chunk)
         if total_bytes == 0:
             raise HTTPException(status_code=400, detail="No file part")
+    TRANSFERRED_BYTES.inc(total_bytes, direction="upload")
     try:
-        validate_video_duration(temp_video.name)
+        await validate_video_duration(temp_video.name)
     except HTTPException:
         safe_remove(temp_video.name)
         raise
@@ -68,7 +73,10 @@ async def upload_video(file: UploadFile, request: Request):
             transcribe_audio,
             translate_text,
             generate_audio,
-            replace_audio
+            replace_audio,
+            transcribe_segments=transcribe_segments,
+            stream_audio=stream_audio,
+            replace_audio_stream=replace_audio_stream,
         )
         return FileResponse(
             output_video,
@@ -82,7 +90,12 @@ async def upload_video(file: UploadFile, request: Request):
         raise HTTPException(status_code=500, detail=f"Error procesando video: {error}")
 
 @upload_router.post("/upload-async")
-async def upload_video_async(file: UploadFile, request: Request, target: str = Query("cloud")):
+async def upload_video_async(
+    file: UploadFile,
+    request: Request,
+    target: str = Query("cloud"),
+    translation_backend: Optional[str] = Query(None),
+):
     enforce_ip_limit(request)
     if not file.filename:
         raise HTTPException(status_code=400, detail="No selected file")
@@ -103,7 +116,8 @@ async def upload_video_async(file: UploadFile, request: Request, target: str = Q
                 safe_remove(temp_file.name)
                 raise HTTPException(status_code=400, detail="No file part")
             temp_path = temp_file.name
-        return enqueue_video(temp_path, target)
+        TRANSFERRED_BYTES.inc(total_bytes, direction="upload")
+        return await enqueue_video(temp_path, target, translation_backend)
     except HTTPException:
         raise
     except Exception as error:
@@ -112,7 +126,12 @@ async def upload_video_async(file: UploadFile, request: Request, target: str = Q
         raise HTTPException(status_code=500, detail=f"Error al encolar el video: {error}")
 
 @upload_router.post("/upload-from-url-async")
-async def upload_video_from_url_async(payload: VideoUrlRequest, request: Request, target: str = Query("cloud")):
+async def upload_video_from_url_async(
+    payload: VideoUrlRequest,
+    request: Request,
+    target: str = Query("cloud"),
+    translation_backend: Optional[str] = Query(None),
+):
     enforce_ip_limit(request)
     url = payload.url.strip()
     if not url:
@@ -122,12 +141,14 @@ async def upload_video_from_url_async(payload: VideoUrlRequest, request: Request
 
     if target not in (JobTarget.CLOUD, JobTarget.PC):
         raise HTTPException(status_code=400, detail="Target inválido. Usa 'cloud' o 'pc'.")
+    if translation_backend and not is_translation_backend(translation_backend):
+        raise HTTPException(status_code=400, detail=f"Backend de traducción inválido: {translation_backend}")
 
     # Si target=pc, el worker local descargará la URL (con cookies de navegador)
     if target == "pc":
         try:
             # Encolar directamente la URL sin descargar en el servidor
-            job_id = create_job(url, JobTarget(target))
+            job_id = create_job(url, JobTarget(target), translation_backend)
             from video_translator.models.job import get_db
             with get_db() as conn:
                 conn.execute("UPDATE jobs SET input_path = ? WHERE id = ?", (url, job_id))
@@ -141,7 +162,7 @@ async def upload_video_from_url_async(payload: VideoUrlRequest, request: Request
     temp_path = None
     try:
         try:
-            duration = get_youtube_duration(url)
+            duration = await run_io_bound(get_youtube_duration, url)
         except Exception as error:
             raise HTTPException(
                 status_code=400,
@@ -165,8 +186,8 @@ async def upload_video_from_url_async(payload: VideoUrlRequest, request: Request
                 ),
             )
 
-        temp_path = download_youtube_video(url)
-        return enqueue_video(temp_path, target)
+        temp_path = await run_io_bound(download_youtube_video, url)
+        return await enqueue_video(temp_path, target, translation_backend)
     except HTTPException:
         if temp_path and os.path.exists(temp_path):
             safe_remove(temp_path)
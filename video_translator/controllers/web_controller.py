@@ -1,10 +1,13 @@
 from pathlib import Path
 
 from fastapi import APIRouter
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from starlette.requests import Request
 
+from video_translator.services.whisper_pool import get_whisper_pool, is_whisper_ready
+from video_translator.utils.shared.metrics import render_metrics
+
 web_router = APIRouter()
 templates = Jinja2Templates(directory=str(Path(__file__).resolve().parents[2] / "templates"))
 
@@ -17,3 +20,16 @@ def index(request: Request):
 @web_router.get("/health")
 def health():
     return JSONResponse({"status": "ok"})
+
+
+@web_router.get("/ready")
+def ready():
+    pool = get_whisper_pool()
+    if not is_whisper_ready():
+        return JSONResponse({"status": pool.status, "error": pool.error}, status_code=503)
+    return JSONResponse({"status": "ready", "whisper_instances": pool.capacity})
+
+
+@web_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
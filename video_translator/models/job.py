@@ -1,11 +1,20 @@
+import os
 import sqlite3
+import threading
 import uuid
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
 from typing import Optional
 
+from video_translator.utils.shared.metrics import (
+    JOB_LEASES_EXPIRED,
+    JOB_QUEUE_OPERATION_SECONDS,
+    JOB_QUEUE_WAIT_SECONDS,
+    JOBS_FINISHED,
+)
+
 
 class JobStatus(str, Enum):
     PENDING = "pending"
@@ -21,16 +30,53 @@ class JobTarget(str, Enum):
 
 
 DB_PATH = Path(__file__).parent.parent.parent / "jobs.db"
+DB_CACHED_STATEMENTS = 256
+# Un job en processing cuyo worker no renueva el lease en este tiempo vuelve a la cola
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+# Intentos (reclamos) antes de marcar como fallido un job cuyo lease expira
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Una conexión por hilo: sqlite3 no permite compartirlas entre hilos y abrir una por llamada es caro
+_thread_state = threading.local()
+
+
+def _open_connection(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=10.0, cached_statements=DB_CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row
+    # WAL: los lectores no bloquean al BEGIN IMMEDIATE del dequeue ni viceversa
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
 
 
 @contextmanager
 def get_db():
-    conn = sqlite3.connect(str(DB_PATH), timeout=10.0)
-    conn.row_factory = sqlite3.Row
+    """Conexión reutilizada del hilo actual; al salir nunca queda una transacción abierta."""
+    conn = getattr(_thread_state, "conn", None)
+    if conn is None or _thread_state.path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = _open_connection(DB_PATH)
+        _thread_state.conn = conn
+        _thread_state.path = DB_PATH
+        _thread_state.depth = 0
+
+    _thread_state.depth += 1
     try:
         yield conn
     finally:
+        _thread_state.depth -= 1
+        # Solo el bloque más externo descarta lo que no se confirmó (error o salida anticipada)
+        if _thread_state.depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+
+def close_db() -> None:
+    """Cierra la conexión del hilo actual."""
+    conn = getattr(_thread_state, "conn", None)
+    if conn is not None:
         conn.close()
+        _thread_state.conn = None
 
 
 def init_db():
@@ -55,10 +101,32 @@ def init_db():
         columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()]
         if "target" not in columns:
             conn.execute("ALTER TABLE jobs ADD COLUMN target TEXT NOT NULL DEFAULT 'any'")
+        if "checkpoint_dir" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN checkpoint_dir TEXT")
+        if "checkpoint_stage" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN checkpoint_stage TEXT")
+        if "translation_backend" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN translation_backend TEXT")
+        if "lease_expires_at" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at TEXT")
+        if "attempts" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        # Jobs reclamados antes de existir los leases: sin vencimiento el sweeper nunca los vería
+        conn.execute(
+            """
+            UPDATE jobs SET lease_expires_at = ?, attempts = MAX(attempts, 1)
+            WHERE status = ? AND lease_expires_at IS NULL
+        """,
+            (_lease_expiry(datetime.utcnow()), JobStatus.PROCESSING),
+        )
 
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_status ON jobs(status)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_target ON jobs(target)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON jobs(created_at)")
+        # La cabeza de la cola por target se lee solo de este índice (incluye id, sin ir a la tabla);
+        # los de una sola columna que había antes son redundantes y solo encarecían cada escritura
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue_head ON jobs(status, target, created_at, id)")
+        conn.execute("DROP INDEX IF EXISTS idx_jobs_queue")
+        conn.execute("DROP INDEX IF EXISTS idx_status")
+        conn.execute("DROP INDEX IF EXISTS idx_target")
+        conn.execute("DROP INDEX IF EXISTS idx_created_at")
 
         conn.execute(
             """
@@ -73,18 +141,29 @@ def init_db():
         conn.commit()
 
 
-def create_job(input_path: str, target: JobTarget = JobTarget.ANY) -> str:
-    """Crea un nuevo job y retorna su ID."""
+def _lease_expiry(now: datetime) -> str:
+    return (now + timedelta(seconds=JOB_LEASE_SECONDS)).isoformat()
+
+
+def _observe_queue_wait(created_at: str, claimed_at: str) -> None:
+    waited = datetime.fromisoformat(claimed_at) - datetime.fromisoformat(created_at)
+    JOB_QUEUE_WAIT_SECONDS.observe(max(waited.total_seconds(), 0.0))
+
+
+def create_job(
+    input_path: str, target: JobTarget = JobTarget.ANY, translation_backend: Optional[str] = None
+) -> str:
+    """Crea un nuevo job y retorna su ID. Sin backend de traducción, el worker usa el suyo por defecto."""
     job_id = str(uuid.uuid4())
     now = datetime.utcnow().isoformat()
 
-    with get_db() as conn:
+    with JOB_QUEUE_OPERATION_SECONDS.time(operation="enqueue"), get_db() as conn:
         conn.execute(
             """
-            INSERT INTO jobs (id, status, target, input_path, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO jobs (id, status, target, input_path, translation_backend, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """,
-            (job_id, JobStatus.PENDING, target, input_path, now, now),
+            (job_id, JobStatus.PENDING, target, input_path, translation_backend, now, now),
         )
         conn.commit()
 
@@ -113,95 +192,209 @@ def get_next_pending_job() -> Optional[dict]:
         return dict(row) if row else None
 
 
-def dequeue_next_pending_job(worker_id: str) -> Optional[dict]:
-    """Obtiene y reclama atómicamente el siguiente job pendiente para un worker."""
-    now = datetime.utcnow().isoformat()
-
+def _allowed_targets(worker_id: str) -> tuple[JobTarget, ...]:
     if worker_id == "render-worker":
-        allowed_targets = (JobTarget.CLOUD, JobTarget.ANY)
-    elif worker_id.startswith("local-worker"):
-        allowed_targets = (JobTarget.PC, JobTarget.ANY)
-    else:
-        allowed_targets = (JobTarget.ANY, JobTarget.CLOUD, JobTarget.PC)
+        return (JobTarget.CLOUD, JobTarget.ANY)
+    if worker_id.startswith("local-worker"):
+        return (JobTarget.PC, JobTarget.ANY)
+    return (JobTarget.ANY, JobTarget.CLOUD, JobTarget.PC)
+
+
+def _queue_head_sql(target_count: int) -> str:
+    """Subconsulta con los ids de los `?` jobs pendientes más antiguos entre los targets dados.
+
+    Cada rama lee la cabeza de un target en idx_jobs_queue_head (O(log n)); un `target IN (...)`
+    obligaría a SQLite a recorrer y ordenar todos los pendientes de esos targets.
+    """
+    branch = "SELECT * FROM (SELECT id, created_at FROM jobs WHERE status = ? AND target = ? ORDER BY created_at LIMIT ?)"
+    branches = " UNION ALL ".join([branch] * target_count)
+    return f"SELECT id FROM ({branches}) ORDER BY created_at LIMIT ?"
+
+
+def dequeue_pending_jobs(worker_id: str, max_jobs: int = 1) -> list[dict]:
+    """Obtiene y reclama atómicamente hasta `max_jobs` jobs pendientes para un worker, con un lease nuevo.
+
+    Los jobs se devuelven del más antiguo al más reciente.
+    """
+    claimed_at = datetime.utcnow()
+    now = claimed_at.isoformat()
+    allowed_targets = _allowed_targets(worker_id)
+    head_params = [param for target in allowed_targets for param in (JobStatus.PENDING, target, max_jobs)]
+
+    with JOB_QUEUE_OPERATION_SECONDS.time(operation="dequeue"), get_db() as conn:
+        # Una sola sentencia: SQLite toma el bloqueo de escritura antes de leer la cabeza de la cola,
+        # así que dos workers nunca reciben el mismo job. Sin filtro de status fuera de la subconsulta:
+        # haría que SQLite recorriera todos los pendientes en vez de buscar los ids por clave primaria
+        job_rows = conn.execute(
+            f"""
+            UPDATE jobs
+            SET status = ?, worker_id = ?, updated_at = ?, lease_expires_at = ?, attempts = attempts + 1
+            WHERE id IN ({_queue_head_sql(len(allowed_targets))})
+            RETURNING *
+            """,
+            (JobStatus.PROCESSING, worker_id, now, _lease_expiry(claimed_at), *head_params, max_jobs),
+        ).fetchall()
+        conn.commit()
 
-    with get_db() as conn:
-        conn.execute("BEGIN IMMEDIATE")
+    # RETURNING no garantiza orden
+    jobs = sorted((dict(row) for row in job_rows), key=lambda job: job["created_at"])
+    for job in jobs:
+        _observe_queue_wait(job["created_at"], now)
+    return jobs
 
-        row = conn.execute(
-            """
-            SELECT id
-            FROM jobs
-            WHERE status = ? AND target IN (?, ?)
-            ORDER BY created_at ASC
-            LIMIT 1
-            """,
-            (JobStatus.PENDING, allowed_targets[0], allowed_targets[1]),
-        ).fetchone()
 
-        if not row:
-            conn.rollback()
-            return None
+def dequeue_next_pending_job(worker_id: str) -> Optional[dict]:
+    """Obtiene y reclama atómicamente el siguiente job pendiente para un worker, con un lease nuevo."""
+    jobs = dequeue_pending_jobs(worker_id, 1)
+    return jobs[0] if jobs else None
 
-        job_id = row["id"]
 
+def finish_job(
+    job_id: str,
+    worker_id: str,
+    status: JobStatus,
+    output_path: Optional[str] = None,
+    error_message: Optional[str] = None,
+) -> bool:
+    """Marca como completado o fallido un job solo si sigue en processing a nombre de ese worker.
+
+    False si el lease venció y el job volvió a la cola o ya lo cerró otro worker.
+    """
+    now = datetime.utcnow().isoformat()
+
+    with get_db() as conn:
         cursor = conn.execute(
             """
             UPDATE jobs
-            SET status = ?, worker_id = ?, updated_at = ?
-            WHERE id = ? AND status = ?
-            """,
-            (JobStatus.PROCESSING, worker_id, now, job_id, JobStatus.PENDING),
+            SET status = ?, output_path = ?, error_message = ?, lease_expires_at = NULL, updated_at = ?
+            WHERE id = ? AND worker_id = ? AND status = ?
+        """,
+            (status, output_path, error_message, now, job_id, worker_id, JobStatus.PROCESSING),
         )
+        conn.commit()
+        finished = cursor.rowcount > 0
 
-        if cursor.rowcount == 0:
-            conn.rollback()
-            return None
+    if finished:
+        JOBS_FINISHED.inc(status=status.value)
+    return finished
 
-        job_row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
-        conn.commit()
 
-        return dict(job_row) if job_row else None
+def claim_job(job_id: str, worker_id: str) -> bool:
+    """Marca un job como en procesamiento por un worker específico, con un lease nuevo."""
+    claimed_at = datetime.utcnow()
+    now = claimed_at.isoformat()
 
+    with JOB_QUEUE_OPERATION_SECONDS.time(operation="claim"), get_db() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE jobs 
+            SET status = ?, worker_id = ?, updated_at = ?, lease_expires_at = ?, attempts = attempts + 1
+            WHERE id = ? AND status = ?
+        """,
+            (JobStatus.PROCESSING, worker_id, now, _lease_expiry(claimed_at), job_id, JobStatus.PENDING),
+        )
+        conn.commit()
+        claimed = cursor.rowcount > 0
+        if claimed:
+            row = conn.execute("SELECT created_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row:
+                _observe_queue_wait(row["created_at"], now)
+        return claimed
 
-def update_job_status(
-    job_id: str,
-    status: JobStatus,
-    output_path: Optional[str] = None,
-    error_message: Optional[str] = None,
-    worker_id: Optional[str] = None,
-):
-    """Actualiza el estado de un job."""
+
+def update_job_checkpoint(job_id: str, checkpoint_dir: Optional[str], checkpoint_stage: Optional[str]) -> None:
+    """Registra la última etapa completada y, si es del servidor, el directorio de checkpoints."""
     now = datetime.utcnow().isoformat()
 
     with get_db() as conn:
         conn.execute(
             """
-            UPDATE jobs 
-            SET status = ?, output_path = ?, error_message = ?, worker_id = ?, updated_at = ?
+            UPDATE jobs
+            SET checkpoint_dir = ?, checkpoint_stage = ?, updated_at = ?
             WHERE id = ?
         """,
-            (status, output_path, error_message, worker_id, now, job_id),
+            (checkpoint_dir, checkpoint_stage, now, job_id),
         )
         conn.commit()
 
 
-def claim_job(job_id: str, worker_id: str) -> bool:
-    """Marca un job como en procesamiento por un worker específico."""
+def requeue_job(job_id: str) -> bool:
+    """Devuelve a pending un job fallido conservando sus checkpoints; vuelve a tener todos sus intentos."""
     now = datetime.utcnow().isoformat()
 
     with get_db() as conn:
         cursor = conn.execute(
             """
-            UPDATE jobs 
-            SET status = ?, worker_id = ?, updated_at = ?
+            UPDATE jobs
+            SET status = ?, worker_id = NULL, error_message = NULL, lease_expires_at = NULL, attempts = 0,
+                updated_at = ?
             WHERE id = ? AND status = ?
         """,
-            (JobStatus.PROCESSING, worker_id, now, job_id, JobStatus.PENDING),
+            (JobStatus.PENDING, now, job_id, JobStatus.FAILED),
         )
         conn.commit()
         return cursor.rowcount > 0
 
 
+def renew_job_lease(job_id: str, worker_id: str) -> bool:
+    """Extiende el lease de un job en processing; False si ya no pertenece a ese worker."""
+    renewed_at = datetime.utcnow()
+
+    with JOB_QUEUE_OPERATION_SECONDS.time(operation="heartbeat"), get_db() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE jobs
+            SET lease_expires_at = ?, updated_at = ?
+            WHERE id = ? AND worker_id = ? AND status = ?
+        """,
+            (_lease_expiry(renewed_at), renewed_at.isoformat(), job_id, worker_id, JobStatus.PROCESSING),
+        )
+        conn.commit()
+        return cursor.rowcount > 0
+
+
+def reclaim_expired_jobs() -> tuple[int, int]:
+    """Devuelve a pending los jobs con lease vencido, o los marca fallidos si agotaron sus intentos.
+
+    Retorna (reencolados, fallidos).
+    """
+    now = datetime.utcnow().isoformat()
+
+    with JOB_QUEUE_OPERATION_SECONDS.time(operation="reclaim"), get_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        failed = conn.execute(
+            """
+            UPDATE jobs
+            SET status = ?, error_message = ?, lease_expires_at = NULL, updated_at = ?
+            WHERE status = ? AND lease_expires_at < ? AND attempts >= ?
+        """,
+            (
+                JobStatus.FAILED,
+                f"El worker dejó de responder {JOB_MAX_ATTEMPTS} veces",
+                now,
+                JobStatus.PROCESSING,
+                now,
+                JOB_MAX_ATTEMPTS,
+            ),
+        ).rowcount
+        requeued = conn.execute(
+            """
+            UPDATE jobs
+            SET status = ?, worker_id = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE status = ? AND lease_expires_at < ?
+        """,
+            (JobStatus.PENDING, now, JobStatus.PROCESSING, now),
+        ).rowcount
+        conn.commit()
+
+    if requeued:
+        JOB_LEASES_EXPIRED.inc(requeued, outcome="requeued")
+    if failed:
+        JOB_LEASES_EXPIRED.inc(failed, outcome="failed")
+        JOBS_FINISHED.inc(failed, status=JobStatus.FAILED.value)
+    return requeued, failed
+
+
 def delete_job(job_id: str) -> None:
     """Elimina un job de la base de datos."""
     with get_db() as conn:
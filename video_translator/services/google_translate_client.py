@@ -0,0 +1,95 @@
+import asyncio
+import os
+import random
+from typing import Optional
+
+import httpx
+
+
+# Endpoint JSON público de Google Translate; configurable para apuntar al servidor stub local
+GOOGLE_TRANSLATE_URL = os.getenv("GOOGLE_TRANSLATE_URL", "https://translate.googleapis.com/translate_a/single")
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+TRANSLATION_RETRIES = int(os.getenv("TRANSLATION_RETRIES", "4"))
+TRANSLATION_TIMEOUT_SECONDS = float(os.getenv("TRANSLATION_TIMEOUT_SECONDS", "20"))
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TranslationRequestError(RuntimeError):
+    pass
+
+
+class GoogleTranslateClient:
+    """Traduce fragmentos en paralelo sobre una sesión HTTP compartida.
+
+    Limita las peticiones simultáneas, reintenta fallos transitorios con backoff exponencial
+    y jitter, y devuelve las traducciones en el mismo orden que los fragmentos.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        target: str,
+        base_url: str = GOOGLE_TRANSLATE_URL,
+        concurrency: int = TRANSLATION_CONCURRENCY,
+        retries: int = TRANSLATION_RETRIES,
+    ):
+        self.source = source
+        self.target = target
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # Una sesión por event loop: el lote crea un loop por video
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=TRANSLATION_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _request(self, text: str) -> str:
+        params = {"client": "gtx", "sl": self.source, "tl": self.target, "dt": "t", "q": text}
+        response = await self._get_client().get(self.base_url, params=params)
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise httpx.HTTPStatusError(
+                f"Respuesta {response.status_code} del traductor", request=response.request, response=response
+            )
+        response.raise_for_status()
+        # [[["traducción", "original", ...], ...], ...]
+        sentences = response.json()[0] or []
+        return "".join(sentence[0] for sentence in sentences if sentence and sentence[0])
+
+    async def translate(self, text: str) -> str:
+        attempt = 0
+        while True:
+            try:
+                return await self._request(text)
+            except (httpx.TransportError, httpx.HTTPStatusError) as error:
+                retryable = (
+                    not isinstance(error, httpx.HTTPStatusError)
+                    or error.response.status_code in RETRYABLE_STATUS_CODES
+                )
+                if not retryable or attempt >= self.retries:
+                    raise TranslationRequestError(
+                        f"Error al traducir tras {attempt + 1} intentos: {error}"
+                    ) from error
+            # Backoff exponencial con jitter completo
+            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt)
+            await asyncio.sleep(random.uniform(0, delay))
+            attempt += 1
+
+    async def translate_many(self, texts: list[str]) -> list[str]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def translate_one(text: str) -> str:
+            async with semaphore:
+                return await self.translate(text)
+
+        return list(await asyncio.gather(*(translate_one(text) for text in texts)))
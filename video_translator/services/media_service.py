@@ -1,42 +1,191 @@
 import json
-import subprocess
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
+from typing import Optional
 
+import numpy as np
 
-def get_video_duration(video_path: str) -> float:
-    """Obtiene la duración del video en segundos usando ffprobe."""
-    result = subprocess.run(
+from video_translator.utils.shared.ffmpeg_runner import run_ffmpeg, run_ffmpeg_with_input, run_ffprobe
+
+
+PROBE_CACHE_SIZE = 256
+# pcm: ffmpeg decodifica a 16 kHz mono float32 en memoria para Whisper; file: escribe un .aac temporal
+AUDIO_EXTRACT_MODE = os.getenv("AUDIO_EXTRACT_MODE", "pcm")
+WHISPER_SAMPLE_RATE = 16000
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    index: int
+    codec_type: str
+    codec_name: str
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    duration: float
+    container: str
+    streams: tuple[StreamInfo, ...]
+
+    @property
+    def audio(self) -> Optional[StreamInfo]:
+        return next((stream for stream in self.streams if stream.codec_type == "audio"), None)
+
+    @property
+    def video(self) -> Optional[StreamInfo]:
+        return next((stream for stream in self.streams if stream.codec_type == "video"), None)
+
+
+_probe_cache: "OrderedDict[tuple[str, int, int], MediaInfo]" = OrderedDict()
+_probe_cache_lock = threading.Lock()
+
+
+def _parse_probe(data: dict) -> MediaInfo:
+    streams = tuple(
+        StreamInfo(
+            index=int(stream.get("index", position)),
+            codec_type=stream.get("codec_type", ""),
+            codec_name=stream.get("codec_name", ""),
+            sample_rate=int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+            channels=int(stream["channels"]) if stream.get("channels") else None,
+        )
+        for position, stream in enumerate(data.get("streams", []))
+    )
+    media_format = data.get("format", {})
+    return MediaInfo(
+        duration=float(media_format["duration"]),
+        container=media_format.get("format_name", ""),
+        streams=streams,
+    )
+
+
+async def probe_media(media_path: str) -> MediaInfo:
+    """Ejecuta ffprobe una sola vez por archivo; el resultado se cachea por ruta, tamaño y mtime."""
+    stat = os.stat(media_path)
+    cache_key = (os.path.abspath(media_path), stat.st_size, stat.st_mtime_ns)
+    with _probe_cache_lock:
+        cached = _probe_cache.get(cache_key)
+        if cached is not None:
+            _probe_cache.move_to_end(cache_key)
+            return cached
+
+    stdout = await run_ffprobe(
         [
-            "ffprobe",
             "-v",
             "error",
             "-show_entries",
-            "format=duration",
+            "format=duration,format_name:stream=index,codec_type,codec_name,sample_rate,channels",
             "-of",
             "json",
+            media_path,
+        ],
+        error_message="No se pudo leer el archivo multimedia",
+    )
+    media_info = _parse_probe(json.loads(stdout))
+
+    with _probe_cache_lock:
+        _probe_cache[cache_key] = media_info
+        while len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+    return media_info
+
+
+async def get_video_duration(video_path: str) -> float:
+    """Obtiene la duración del video en segundos usando ffprobe."""
+    return (await probe_media(video_path)).duration
+
+
+async def extract_audio_pcm(video_path: str) -> np.ndarray:
+    """Decodifica y remuestrea la pista de audio a PCM float32 mono de 16 kHz, sin archivo intermedio."""
+    stdout = await run_ffmpeg(
+        [
+            "-i",
             video_path,
+            "-vn",
+            "-map",
+            "0:a:0",
+            "-ac",
+            "1",
+            "-ar",
+            str(WHISPER_SAMPLE_RATE),
+            "-f",
+            "f32le",
+            "-acodec",
+            "pcm_f32le",
+            "pipe:1",
         ],
-        capture_output=True,
-        text=True,
-        check=True,
+        capture_stdout=True,
+        error_message="Error al extraer audio",
     )
-    data = json.loads(result.stdout)
-    return float(data["format"]["duration"])
 
+    audio = np.frombuffer(stdout, dtype=np.float32)
+    if audio.size == 0:
+        raise RuntimeError("Error al extraer audio: el video no tiene pista de audio")
+    return audio
 
-def extract_audio(video_path: str, audio_path: str) -> None:
-    result = subprocess.run(
-        ["ffmpeg", "-y", "-i", video_path, "-vn", "-acodec", "copy", audio_path],
-        capture_output=True,
-        text=True,
+
+async def extract_audio(video_path: str, audio_path: str) -> Optional[np.ndarray]:
+    """Extrae el audio para transcribir.
+
+    En modo pcm retorna el audio en memoria y no escribe audio_path; en modo file lo escribe y retorna None.
+    """
+    if AUDIO_EXTRACT_MODE == "pcm":
+        return await extract_audio_pcm(video_path)
+
+    media_info = await probe_media(video_path)
+    if media_info.audio is None:
+        raise RuntimeError("Error al extraer audio: el video no tiene pista de audio")
+
+    # Solo AAC se puede copiar tal cual a un .aac; Opus/Vorbis/MP3 de YouTube se recodifican
+    if media_info.audio.codec_name == "aac":
+        codec_args = ["-acodec", "copy"]
+    else:
+        codec_args = ["-acodec", "aac", "-b:a", "128k"]
+
+    await run_ffmpeg(
+        ["-y", "-i", video_path, "-vn", "-map", "0:a:0", *codec_args, audio_path],
+        error_message="Error al extraer audio",
     )
-    if result.returncode != 0:
-        raise RuntimeError(f"Error al extraer audio: {result.stderr}")
+    return None
+
+
+# Códecs de audio que cada contenedor de salida acepta sin recodificar (el TTS entrega MP3)
+_COPYABLE_AUDIO_CODECS = {
+    ".mp4": {"aac", "mp3", "alac"},
+    ".m4v": {"aac", "mp3", "alac"},
+    ".mov": {"aac", "mp3", "alac", "pcm_s16le"},
+    ".mkv": None,
+    ".webm": {"opus", "vorbis"},
+}
+_FASTSTART_CONTAINERS = {".mp4", ".m4v", ".mov"}
+
 
+async def _audio_codec_args(audio_path: str, output_video: str) -> list[str]:
+    extension = os.path.splitext(output_video)[1].lower()
+    copyable = _COPYABLE_AUDIO_CODECS.get(extension, set())
+    audio_stream = (await probe_media(audio_path)).audio
+    if audio_stream is not None and (copyable is None or audio_stream.codec_name in copyable):
+        return ["-c:a", "copy"]
+    if extension == ".webm":
+        return ["-c:a", "libopus", "-b:a", "64k"]
+    return ["-c:a", "aac", "-b:a", "128k"]
 
-def replace_audio(video_path: str, audio_path: str, output_video: str) -> None:
-    result = subprocess.run(
+
+async def replace_audio(video_path: str, audio_path: str, output_video: str) -> None:
+    """Remuxea el video con el audio traducido sin recodificar cuando el contenedor lo permite.
+
+    En MP4/MOV el moov se escribe al inicio (+faststart) en la misma pasada para que el
+    navegador pueda empezar a reproducir sin descargar el archivo completo.
+    """
+    extension = os.path.splitext(output_video)[1].lower()
+    faststart_args = ["-movflags", "+faststart"] if extension in _FASTSTART_CONTAINERS else []
+    await run_ffmpeg(
         [
-            "ffmpeg",
             "-y",
             "-i",
             video_path,
@@ -44,14 +193,68 @@ def replace_audio(video_path: str, audio_path: str, output_video: str) -> None:
             audio_path,
             "-c:v",
             "copy",
+            *(await _audio_codec_args(audio_path, output_video)),
             "-map",
             "0:v:0",
             "-map",
             "1:a:0",
+            *faststart_args,
             output_video,
         ],
-        capture_output=True,
-        text=True,
+        error_message="Error al reemplazar audio",
     )
-    if result.returncode != 0:
-        raise RuntimeError(f"Error al reemplazar audio (código {result.returncode}): {result.stderr}")
+
+
+async def replace_audio_stream(video_path: str, audio_chunks: AsyncIterable[bytes], output_video: str) -> None:
+    """Muxea el video copiado con audio MP3 que llega por stdin a medida que se sintetiza.
+
+    El archivo queda finalizado en cuanto llega el último bloque, sin escribir ni releer un MP3 intermedio.
+    """
+    extension = os.path.splitext(output_video)[1].lower()
+    copyable = _COPYABLE_AUDIO_CODECS.get(extension, set())
+    if copyable is None or "mp3" in copyable:
+        audio_codec_args = ["-c:a", "copy"]
+    elif extension == ".webm":
+        audio_codec_args = ["-c:a", "libopus", "-b:a", "64k"]
+    else:
+        audio_codec_args = ["-c:a", "aac", "-b:a", "128k"]
+    faststart_args = ["-movflags", "+faststart"] if extension in _FASTSTART_CONTAINERS else []
+    await run_ffmpeg_with_input(
+        [
+            "-y",
+            "-i",
+            video_path,
+            "-f",
+            "mp3",
+            "-i",
+            "pipe:0",
+            "-c:v",
+            "copy",
+            *audio_codec_args,
+            "-map",
+            "0:v:0",
+            "-map",
+            "1:a:0",
+            *faststart_args,
+            output_video,
+        ],
+        audio_chunks,
+        error_message="Error al reemplazar audio",
+    )
+
+
+async def concat_audio(part_paths: list[str], output_audio: str) -> None:
+    """Une en orden audios del mismo formato sin recodificar (demuxer concat de ffmpeg)."""
+    list_path = f"{output_audio}.concat.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for part_path in part_paths:
+            escaped = os.path.abspath(part_path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        await run_ffmpeg(
+            ["-y", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_audio],
+            error_message="Error al concatenar el audio",
+        )
+    finally:
+        if os.path.exists(list_path):
+            os.remove(list_path)
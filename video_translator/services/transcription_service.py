@@ -1,22 +1,230 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator
 from functools import lru_cache
+import hashlib
 import os
+import re
 
-from faster_whisper import WhisperModel
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+from video_translator.services.whisper_pool import get_whisper_pool
+from video_translator.utils.shared.artifact_cache import build_cache_key, get_artifact_cache, hash_file
+from video_translator.utils.shared.executors import run_io_bound
 
 WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL", "base.en")
+# Hilos de CTranslate2 por instancia (0 = valor por defecto de faster-whisper); el pool lo fija por proceso
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0") or 0)
+# Modo por lotes: divide el audio en fragmentos delimitados por VAD y los decodifica juntos (0 = secuencial)
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "0") or 0)
+# Audios largos: se cortan en silencios en N tramos que se transcriben en paralelo en el pool (0 = desactivado)
+WHISPER_PARALLEL_SPANS = int(os.getenv("WHISPER_PARALLEL_SPANS", "0") or 0)
+TRANSCRIPTION_LANGUAGE = "en"
+
+WHISPER_SAMPLE_RATE = 16000
+MIN_SPAN_SECONDS = 30
+# Margen alrededor del corte ideal donde se busca el silencio más profundo
+SPAN_SEARCH_SECONDS = 5.0
+# Audio compartido entre tramos vecinos para no partir una palabra en el corte
+SPAN_OVERLAP_SECONDS = 0.3
+ENERGY_FRAME_SAMPLES = 480  # 30 ms
+
+# (inicio, fin, texto) con marcas de tiempo absolutas en segundos
+TimedSegment = tuple[float, float, str]
+
+# Ruta a un archivo de audio o PCM float32 mono de 16 kHz ya decodificado
+AudioInput = str | np.ndarray
 
 
 @lru_cache(maxsize=1)
 def _get_whisper_model():
-    return WhisperModel(WHISPER_MODEL_NAME, device="cpu", compute_type="int8")
+    return WhisperModel(
+        WHISPER_MODEL_NAME,
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=WHISPER_CPU_THREADS,
+        num_workers=1,
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_batched_pipeline() -> BatchedInferencePipeline:
+    return BatchedInferencePipeline(model=_get_whisper_model())
+
+
+def warm_up_model() -> None:
+    """Carga el modelo y decodifica un segundo de silencio para dejar listos los kernels y cachés."""
+    silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+    # Sin VAD para forzar una pasada real del codificador y el decodificador
+    segments, _info = _get_whisper_model().transcribe(
+        silence, language=TRANSCRIPTION_LANGUAGE, beam_size=1, vad_filter=False
+    )
+    # Los segmentos son perezosos: hay que consumirlos para que la inferencia ocurra
+    for _segment in segments:
+        pass
+
+
+def _hash_audio(audio: AudioInput) -> str:
+    if isinstance(audio, np.ndarray):
+        return hashlib.sha256(np.ascontiguousarray(audio, dtype=np.float32).tobytes()).hexdigest()
+    return hash_file(audio)
+
 
+def _run_whisper(audio: AudioInput) -> Iterable:
+    if WHISPER_BATCH_SIZE > 1:
+        # El pipeline por lotes entrega los segmentos en orden y con marcas de tiempo absolutas
+        segments, _info = _get_batched_pipeline().transcribe(
+            audio,
+            language=TRANSCRIPTION_LANGUAGE,
+            beam_size=1,
+            batch_size=WHISPER_BATCH_SIZE,
+        )
+    else:
+        segments, _info = _get_whisper_model().transcribe(
+            audio, vad_filter=True, language=TRANSCRIPTION_LANGUAGE, beam_size=1
+        )
+    return segments
 
-def transcribe_audio(audio_path: str) -> str:
-    model = _get_whisper_model()
-    segments, _info = model.transcribe(audio_path, vad_filter=True, language="en", beam_size=1)
-    text = " ".join(segment.text.strip() for segment in segments if segment.text).strip()
+
+def _decode_segments(audio: AudioInput) -> Iterator[str]:
+    for segment in _run_whisper(audio):
+        text = segment.text.strip() if segment.text else ""
+        if text:
+            yield text
+
+
+def _transcript_cache_key(audio: AudioInput, decode_mode: str) -> str:
+    return build_cache_key(_hash_audio(audio), WHISPER_MODEL_NAME, TRANSCRIPTION_LANGUAGE, decode_mode)
+
+
+def transcribe_segments_local(audio: AudioInput) -> Iterator[str]:
+    """Entrega el texto de cada segmento a medida que el modelo de este proceso lo decodifica."""
+    cache = get_artifact_cache()
+    if cache is None:
+        yield from _decode_segments(audio)
+        return
+
+    decode_mode = f"batched-{WHISPER_BATCH_SIZE}" if WHISPER_BATCH_SIZE > 1 else "sequential"
+    cache_key = _transcript_cache_key(audio, decode_mode)
+    cached_segments = cache.get_json("transcript", cache_key)
+    if cached_segments is not None:
+        yield from cached_segments
+        return
+
+    decoded: list[str] = []
+    for text in _decode_segments(audio):
+        decoded.append(text)
+        yield text
+    if decoded:
+        cache.put_json("transcript", cache_key, decoded)
+
+
+def transcribe_audio_local(audio: AudioInput) -> str:
+    """Transcribe con el modelo de este proceso (lo que ejecuta cada instancia del pool)."""
+    # Un segmento por línea: el troceado para traducción prefiere cortar entre segmentos
+    text = "\n".join(transcribe_segments_local(audio)).strip()
 
     if not text:
         raise ValueError("El texto transcrito está vacío. Verifica el audio de entrada.")
 
     return text
+
+
+def transcribe_segments(audio: AudioInput) -> AsyncIterator[str]:
+    """Entrega los segmentos a medida que una instancia libre del pool de Whisper los decodifica."""
+    return get_whisper_pool().stream(transcribe_segments_local, audio)
+
+
+def _split_at_silence(audio: np.ndarray, spans: int) -> list[tuple[int, int]]:
+    """Divide el audio en `spans` tramos de duración similar, cortando en el frame de menor energía
+    cerca de cada corte ideal. Lineal en la duración del audio."""
+    frames = len(audio) // ENERGY_FRAME_SAMPLES
+    energy = np.square(audio[: frames * ENERGY_FRAME_SAMPLES].reshape(frames, ENERGY_FRAME_SAMPLES)).mean(axis=1)
+    search = int(SPAN_SEARCH_SECONDS * WHISPER_SAMPLE_RATE / ENERGY_FRAME_SAMPLES)
+
+    cut_frames = [0]
+    for index in range(1, spans):
+        target = index * frames // spans
+        low = max(target - search, cut_frames[-1] + 1)
+        high = min(target + search, frames - 1)
+        if high <= low:
+            continue
+        cut_frames.append(low + int(np.argmin(energy[low:high])))
+
+    cuts = [frame * ENERGY_FRAME_SAMPLES for frame in cut_frames] + [len(audio)]
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def transcribe_span_local(audio: np.ndarray, offset_seconds: float) -> list[TimedSegment]:
+    """Transcribe un tramo en la instancia de este proceso y desplaza sus marcas de tiempo."""
+    return [
+        (offset_seconds + segment.start, offset_seconds + segment.end, segment.text.strip())
+        for segment in _run_whisper(audio)
+        if segment.text and segment.text.strip()
+    ]
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _trim_repeated_prefix(previous: str, text: str, max_words: int = 8) -> str:
+    """Quita del inicio de `text` las palabras que repiten el final de `previous` (solape entre tramos)."""
+    previous_words = [_normalize_word(word) for word in previous.split()]
+    words = text.split()
+    normalized = [_normalize_word(word) for word in words]
+    for size in range(min(max_words, len(previous_words), len(words)), 0, -1):
+        if previous_words[-size:] == normalized[:size]:
+            return " ".join(words[size:])
+    return text
+
+
+def _merge_spans(spans: list[list[TimedSegment]]) -> list[str]:
+    merged: list[TimedSegment] = []
+    for segments in spans:
+        for start, end, text in segments:
+            # Solo los segmentos que empiezan dentro del solape pueden repetir texto del tramo anterior
+            if merged and start < merged[-1][1]:
+                text = _trim_repeated_prefix(merged[-1][2], text)
+                if not text:
+                    continue
+            merged.append((start, end, text))
+    return [text for _start, _end, text in merged]
+
+
+async def _transcribe_parallel(audio: np.ndarray, spans: int) -> str:
+    cache = get_artifact_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = await run_io_bound(_transcript_cache_key, audio, f"parallel-{spans}")
+        cached_segments = await run_io_bound(cache.get_json, "transcript", cache_key)
+        if cached_segments is not None:
+            return "\n".join(cached_segments).strip()
+
+    overlap = int(SPAN_OVERLAP_SECONDS * WHISPER_SAMPLE_RATE)
+    pool = get_whisper_pool()
+    tasks = []
+    for start, end in _split_at_silence(audio, spans):
+        span_start = max(0, start - overlap)
+        span_audio = audio[span_start : min(len(audio), end + overlap)]
+        tasks.append(pool.run(transcribe_span_local, span_audio, span_start / WHISPER_SAMPLE_RATE))
+    segments = _merge_spans(list(await asyncio.gather(*tasks)))
+
+    text = "\n".join(segments).strip()
+    if not text:
+        raise ValueError("El texto transcrito está vacío. Verifica el audio de entrada.")
+    if cache is not None:
+        await run_io_bound(cache.put_json, "transcript", cache_key, segments)
+    return text
+
+
+async def transcribe_audio(audio: AudioInput) -> str:
+    """Transcribe en una instancia libre del pool de Whisper, esperando en cola si no hay ninguna.
+
+    Con WHISPER_PARALLEL_SPANS > 1 el PCM largo se reparte en tramos entre varias instancias.
+    """
+    if WHISPER_PARALLEL_SPANS > 1 and isinstance(audio, np.ndarray):
+        spans = min(WHISPER_PARALLEL_SPANS, len(audio) // (MIN_SPAN_SECONDS * WHISPER_SAMPLE_RATE))
+        if spans > 1:
+            return await _transcribe_parallel(audio, spans)
+    return await get_whisper_pool().run(transcribe_audio_local, audio)
@@ -0,0 +1,121 @@
+import json
+import os
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Protocol
+
+from video_translator.services.google_translate_client import GoogleTranslateClient
+from video_translator.utils.shared.executors import run_io_bound
+from video_translator.utils.text import pack_sentences, split_text
+
+
+# Backend por defecto; cada job puede pedir otro (p. ej. "local" en workers de PC)
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google")
+# JSON {"oración": "traducción"} para el backend de pruebas "echo"
+TRANSLATION_DICTIONARY_PATH = os.getenv("TRANSLATION_DICTIONARY_PATH", "")
+REQUEST_MAX_CHARS = 500
+
+
+class TranslationBackend(Protocol):
+    name: str
+    # False si sus resultados no deben guardarse en la memoria de traducción ni en la caché
+    cacheable: bool
+
+    async def translate_many(self, sentences: list[str]) -> list[str]:
+        """Traduce las oraciones y devuelve una traducción por oración, en el mismo orden."""
+        ...
+
+
+class GoogleBackend:
+    name = "google"
+    cacheable = True
+
+    def __init__(self, source: str, target: str):
+        self.client = GoogleTranslateClient(source=source, target=target)
+
+    async def translate_many(self, sentences: list[str]) -> list[str]:
+        # Una línea por oración; las que superan el límite de la petición van en varias líneas
+        pieces = [split_text(sentence, REQUEST_MAX_CHARS) for sentence in sentences]
+        batches = pack_sentences([line for lines in pieces for line in lines], REQUEST_MAX_CHARS)
+        results = await self.client.translate_many(["\n".join(batch) for batch in batches])
+
+        translations: dict[str, str] = {}
+        fallback: list[str] = []
+        for batch, result in zip(batches, results):
+            lines = [line.strip() for line in result.split("\n")]
+            if len(lines) == len(batch):
+                translations.update(zip(batch, lines))
+            else:
+                fallback.extend(batch)
+        if fallback:
+            # El traductor fusionó o partió líneas: esas líneas se piden una por una
+            translations.update(zip(fallback, await self.client.translate_many(fallback)))
+        return [" ".join(translations[line] for line in lines) for lines in pieces]
+
+
+class LocalBackend:
+    """Traducción en CPU con Argos Translate; no usa la red una vez instalado el paquete de idiomas."""
+
+    name = "local"
+    cacheable = True
+
+    def __init__(self, source: str, target: str):
+        try:
+            from argostranslate import translate
+        except ImportError as error:
+            raise RuntimeError(
+                "El backend local requiere argostranslate: pip install argostranslate "
+                f"&& argospm install translate-{source}_{target}"
+            ) from error
+
+        languages = {language.code: language for language in translate.get_installed_languages()}
+        if source not in languages or target not in languages:
+            raise RuntimeError(f"Falta el paquete de Argos: argospm install translate-{source}_{target}")
+        self._translation = languages[source].get_translation(languages[target])
+        if self._translation is None:
+            raise RuntimeError(f"Falta el paquete de Argos: argospm install translate-{source}_{target}")
+
+    def _translate_all(self, sentences: list[str]) -> list[str]:
+        return [self._translation.translate(sentence) for sentence in sentences]
+
+    async def translate_many(self, sentences: list[str]) -> list[str]:
+        return await run_io_bound(self._translate_all, sentences)
+
+
+class EchoBackend:
+    """Backend determinista para pruebas: usa un diccionario si existe y si no marca el texto con el idioma."""
+
+    name = "echo"
+    cacheable = False
+
+    def __init__(self, source: str, target: str):
+        self.target = target
+        self.dictionary: dict[str, str] = {}
+        if TRANSLATION_DICTIONARY_PATH:
+            with open(TRANSLATION_DICTIONARY_PATH, encoding="utf-8") as f:
+                self.dictionary = json.load(f)
+
+    async def translate_many(self, sentences: list[str]) -> list[str]:
+        return [self.dictionary.get(sentence, f"[{self.target}] {sentence}") for sentence in sentences]
+
+
+_BACKENDS: dict[str, Callable[[str, str], TranslationBackend]] = {
+    GoogleBackend.name: GoogleBackend,
+    LocalBackend.name: LocalBackend,
+    EchoBackend.name: EchoBackend,
+}
+
+
+def register_translation_backend(name: str, factory: Callable[[str, str], TranslationBackend]) -> None:
+    _BACKENDS[name] = factory
+
+
+def is_translation_backend(name: str) -> bool:
+    return name in _BACKENDS
+
+
+@lru_cache(maxsize=None)
+def get_translation_backend(name: str, source: str, target: str) -> TranslationBackend:
+    if name not in _BACKENDS:
+        raise ValueError(f"Backend de traducción desconocido: {name}. Opciones: {', '.join(sorted(_BACKENDS))}")
+    return _BACKENDS[name](source, target)
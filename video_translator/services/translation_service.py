@@ -1,21 +1,42 @@
-from deep_translator import GoogleTranslator
+from typing import Optional
 
-from video_translator.utils.text import split_text
+from video_translator.services.translation_backends import TRANSLATION_BACKEND, get_translation_backend
+from video_translator.utils.shared.artifact_cache import build_cache_key, get_artifact_cache
+from video_translator.utils.shared.executors import run_io_bound
+from video_translator.utils.shared.translation_memory import get_translation_memory
+from video_translator.utils.text import normalize_sentence, split_sentences
 
+SOURCE_LANGUAGE = "en"
+TARGET_LANGUAGE = "es"
 
-def translate_text(text: str) -> str:
-    text_parts = split_text(text, max_length=500)
-    translator = GoogleTranslator(source="en", target="es")
-    translated_text_parts: list[str] = []
 
-    for part in text_parts:
-        translated_part = translator.translate(part)
-        if translated_part:
-            translated_text_parts.append(translated_part)
+async def translate_text(text: str, backend: Optional[str] = None) -> str:
+    """Traduce con el backend indicado por el job o, si no hay, con TRANSLATION_BACKEND."""
+    translator = get_translation_backend(backend or TRANSLATION_BACKEND, SOURCE_LANGUAGE, TARGET_LANGUAGE)
+    cache = get_artifact_cache() if translator.cacheable else None
+    cache_key = build_cache_key(text, SOURCE_LANGUAGE, TARGET_LANGUAGE, translator.name)
+    if cache is not None:
+        cached = await run_io_bound(cache.get_bytes, "translation", cache_key)
+        if cached is not None:
+            return cached.decode("utf-8")
 
-    translated_text = " ".join(translated_text_parts).strip()
+    sentences = [normalize_sentence(sentence) for sentence in split_sentences(text)]
+    # La memoria de traducción se consulta antes de cualquier petición; solo los fallos van al backend
+    memory = get_translation_memory() if translator.cacheable else None
+    known = await run_io_bound(memory.lookup, sentences, SOURCE_LANGUAGE, TARGET_LANGUAGE) if memory else {}
+    misses = [sentence for sentence in dict.fromkeys(sentences) if sentence not in known]
+    if misses:
+        translated = dict(zip(misses, await translator.translate_many(misses)))
+        if memory is not None:
+            learned = {source: translation for source, translation in translated.items() if translation}
+            await run_io_bound(memory.store, learned, SOURCE_LANGUAGE, TARGET_LANGUAGE)
+        known.update(translated)
+
+    translated_text = " ".join(known[sentence] for sentence in sentences if known.get(sentence)).strip()
 
     if not translated_text:
         raise ValueError("Error al traducir el texto. La traducción es nula o vacía.")
 
+    if cache is not None:
+        await run_io_bound(cache.put_bytes, "translation", cache_key, translated_text.encode("utf-8"))
     return translated_text
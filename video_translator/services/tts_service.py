@@ -1,14 +1,135 @@
+import asyncio
 import os
+import random
+import tempfile
+from collections.abc import AsyncIterator
+from typing import Optional
 
 import edge_tts
+import httpx
 
+from video_translator.services.media_service import concat_audio
+from video_translator.utils.shared.artifact_cache import build_cache_key, get_artifact_cache
+from video_translator.utils.shared.executors import run_io_bound
+from video_translator.utils.text import normalize_sentence, split_sentences
 
-async def generate_audio(text: str, output_audio: str, voice: str = "es-PE-AlexNeural") -> None:
+DEFAULT_VOICE = "es-PE-AlexNeural"
+# Velocidad de habla de edge-tts (p. ej. "+10%"); forma parte de la clave de la caché de audio
+TTS_RATE = os.getenv("TTS_RATE", "+0%")
+# Fragmentos sintetizados a la vez y reintentos por fragmento
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+TTS_RETRIES = int(os.getenv("TTS_RETRIES", "3"))
+# Servidor HTTP alternativo a edge-tts (p. ej. python -m video_translator.stubs.tts_server)
+TTS_SERVER_URL = os.getenv("TTS_SERVER_URL", "")
+TTS_TIMEOUT_SECONDS = 60.0
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+
+
+async def _synthesize(text: str, voice: str, rate: str, client: Optional[httpx.AsyncClient]) -> bytes:
+    if client is None:
+        tts = edge_tts.Communicate(text, voice, rate=rate)
+        return b"".join([chunk["data"] async for chunk in tts.stream() if chunk["type"] == "audio"])
+
+    response = await client.post(TTS_SERVER_URL, json={"text": text, "voice": voice, "rate": rate})
+    response.raise_for_status()
+    return response.content
+
+
+async def _synthesize_piece(text: str, voice: str, rate: str, client: Optional[httpx.AsyncClient]) -> bytes:
+    """Sintetiza un fragmento; si falla se reintenta solo ese fragmento con backoff y jitter.
+
+    El audio se guarda en la caché de artefactos por (voz, velocidad, texto normalizado), así que
+    las frases repetidas cuestan una lectura de disco en lugar de una petición.
+    """
+    text = normalize_sentence(text)
+    cache = get_artifact_cache()
+    cache_key = build_cache_key(voice, rate, text)
+    if cache is not None:
+        cached = await run_io_bound(cache.get_bytes, "tts", cache_key)
+        if cached is not None:
+            return cached
+
+    attempt = 0
+    while True:
+        try:
+            audio = await _synthesize(text, voice, rate, client)
+            if not audio:
+                raise ValueError("El audio generado está vacío.")
+            break
+        except Exception as error:
+            if attempt >= TTS_RETRIES:
+                raise RuntimeError(f"Error generando audio tras {attempt + 1} intentos: {error}") from error
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt)
+        await asyncio.sleep(random.uniform(0, delay))
+        attempt += 1
+
+    if cache is not None:
+        await run_io_bound(cache.put_bytes, "tts", cache_key, audio)
+    return audio
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def _synthesize_in_order(
+    pieces: list[str], voice: str, rate: str, client: Optional[httpx.AsyncClient]
+) -> AsyncIterator[bytes]:
+    """Sintetiza los fragmentos en paralelo (acotado) y los entrega en orden según van estando listos."""
+    semaphore = asyncio.Semaphore(max(1, TTS_CONCURRENCY))
+
+    async def synthesize(piece: str) -> bytes:
+        async with semaphore:
+            return await _synthesize_piece(piece, voice, rate, client)
+
+    tasks = [asyncio.ensure_future(synthesize(piece)) for piece in pieces]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        # Si un fragmento agotó sus reintentos o el consumidor se detuvo, se cancelan los pendientes
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def generate_audio(text: str, output_audio: str, voice: str = DEFAULT_VOICE, rate: str = TTS_RATE) -> None:
+    """Sintetiza el texto por oraciones en paralelo y las concatena en orden sin recodificar."""
     if not text:
         raise ValueError("El texto para generar audio está vacío.")
 
-    tts = edge_tts.Communicate(text, voice)
-    await tts.save(output_audio)
+    pieces = split_sentences(text) or [text]
+    client = httpx.AsyncClient(timeout=TTS_TIMEOUT_SECONDS) if TTS_SERVER_URL else None
+    try:
+        if len(pieces) == 1:
+            await run_io_bound(_write_bytes, output_audio, await _synthesize_piece(pieces[0], voice, rate, client))
+        else:
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_audio))) as parts_dir:
+                part_paths: list[str] = []
+                async for audio in _synthesize_in_order(pieces, voice, rate, client):
+                    part_path = os.path.join(parts_dir, f"piece_{len(part_paths):04d}.mp3")
+                    await run_io_bound(_write_bytes, part_path, audio)
+                    part_paths.append(part_path)
+                await concat_audio(part_paths, output_audio)
+    finally:
+        if client is not None:
+            await client.aclose()
 
     if not os.path.exists(output_audio) or os.path.getsize(output_audio) == 0:
         raise ValueError("El archivo de audio generado está vacío.")
+
+
+async def stream_audio(text: str, voice: str = DEFAULT_VOICE, rate: str = TTS_RATE) -> AsyncIterator[bytes]:
+    """Entrega el MP3 de cada oración en orden apenas está listo, para muxearlo sin archivo intermedio."""
+    if not text:
+        raise ValueError("El texto para generar audio está vacío.")
+
+    client = httpx.AsyncClient(timeout=TTS_TIMEOUT_SECONDS) if TTS_SERVER_URL else None
+    try:
+        async for audio in _synthesize_in_order(split_sentences(text) or [text], voice, rate, client):
+            yield audio
+    finally:
+        if client is not None:
+            await client.aclose()
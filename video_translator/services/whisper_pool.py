@@ -0,0 +1,267 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Optional
+
+from video_translator.utils.shared.executors import run_io_bound
+from video_translator.utils.shared.metrics import Gauge, Histogram, register_collector
+
+
+
+def _available_cpus() -> int:
+    """Núcleos que este proceso puede usar de verdad: afinidad y cuota de CPU del cgroup (contenedores)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS/Windows no tienen sched_getaffinity
+        cpus = os.cpu_count() or 1
+    try:
+        # cgroup v2: "max 100000" sin límite, "150000 100000" = 1.5 CPUs
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+CPU_COUNT = _available_cpus()
+# Carga y calienta los modelos al arrancar la app; /ready responde 503 hasta que terminen
+PRELOAD_WHISPER_AT_STARTUP = os.getenv("PRELOAD_WHISPER_AT_STARTUP", "1") == "1"
+
+
+def _default_pool_config() -> tuple[int, int]:
+    """Reparte los núcleos entre instancias: tamaño del pool x hilos por modelo <= núcleos."""
+    size = int(os.getenv("WHISPER_POOL_SIZE", "0") or 0)
+    cpu_threads = int(os.getenv("WHISPER_CPU_THREADS", "0") or 0)
+    if size <= 0 and cpu_threads <= 0:
+        cpu_threads = min(4, CPU_COUNT)
+    if size <= 0:
+        size = max(1, CPU_COUNT // cpu_threads)
+    if cpu_threads <= 0:
+        cpu_threads = max(1, CPU_COUNT // size)
+    return size, cpu_threads
+
+
+def _init_whisper_process(cpu_threads: int) -> None:
+    """Cada proceso del pool carga una sola instancia del modelo con su presupuesto de hilos."""
+    from video_translator.services import transcription_service
+
+    transcription_service.WHISPER_CPU_THREADS = cpu_threads
+    transcription_service._get_whisper_model()
+
+
+def _stream_generator(func: Callable[..., Any], args: tuple, items: Any, stop: Any) -> None:
+    """Corre en un proceso del pool: envía cada elemento del generador por la cola y None al terminar."""
+    try:
+        for item in func(*args):
+            if stop.is_set():
+                break
+            items.put(item)
+    finally:
+        items.put(None)
+
+
+def _next_streamed_item(items: Any, future: Future) -> Any:
+    """Espera el siguiente elemento; None si el proceso terminó (o murió) sin enviar más."""
+    while True:
+        try:
+            return items.get(timeout=0.5)
+        except queue.Empty:
+            if future.done():
+                return None
+
+
+def _warm_up_instance() -> None:
+    from video_translator.services import transcription_service
+
+    transcription_service.warm_up_model()
+
+
+class WhisperPool:
+    """Pool de procesos con un modelo Whisper cada uno.
+
+    Un job toma una instancia libre (checkout) y espera en cola si todas están ocupadas.
+    Con size=0 transcribe en el propio proceso, en el pool de hilos.
+    """
+
+    def __init__(self, size: int, cpu_threads: int):
+        self.size = size
+        self.cpu_threads = cpu_threads
+        self.in_use = 0
+        self.waiting = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Colas entre procesos para stream(); se crea con el primer uso
+        self._manager: Optional[Any] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor_lock = threading.Lock()
+        # idle -> loading -> ready | error
+        self.status = "idle"
+        self.error: Optional[str] = None
+
+    @property
+    def capacity(self) -> int:
+        return max(1, self.size)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.size <= 0:
+            return None
+        # La precarga crea el pool desde otro hilo
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    # spawn evita heredar hilos y sockets del servidor uvicorn en el fork
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_whisper_process,
+                    initargs=(self.cpu_threads,),
+                )
+            return self._executor
+
+    def _get_manager(self) -> Any:
+        with self._executor_lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+            return self._manager
+
+    def preload(self) -> None:
+        """Carga el modelo en cada instancia y ejecuta una inferencia de calentamiento (bloqueante)."""
+        self.status = "loading"
+        started = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                _warm_up_instance()
+            else:
+                # Tareas simultáneas para que el pool levante todos sus procesos
+                for future in [executor.submit(_warm_up_instance) for _ in range(self.size)]:
+                    future.result()
+        except Exception as error:
+            self.status = "error"
+            self.error = str(error)
+            print(f"❌ Error precargando Whisper: {error}")
+            return
+        self.status = "ready"
+        print(f"✅ Whisper listo ({self.capacity} instancias, {time.perf_counter() - started:.1f}s)")
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            # El lote crea un event loop por video; el semáforo debe pertenecer al loop actual
+            self._slots = asyncio.Semaphore(self.capacity)
+            self._slots_loop = loop
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        WHISPER_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+        self.in_use += 1
+        try:
+            yield
+        finally:
+            self.in_use -= 1
+            self._slots.release()
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        async with self.checkout():
+            executor = self._get_executor()
+            if executor is None:
+                return await run_io_bound(func, *args)
+            return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args))
+
+    async def stream(self, func: Callable[..., Any], *args: Any) -> AsyncIterator[Any]:
+        """Como run, para generadores: cada elemento llega apenas la instancia lo produce.
+
+        La instancia queda ocupada hasta que el generador termina; sus elementos no pueden ser None.
+        """
+        async with self.checkout():
+            executor = self._get_executor()
+            if executor is None:
+                iterator = iter(func(*args))
+                while (item := await run_io_bound(next, iterator, None)) is not None:
+                    yield item
+                return
+
+            manager = self._get_manager()
+            items = manager.Queue()
+            stop = manager.Event()
+            future = executor.submit(_stream_generator, func, args, items, stop)
+            try:
+                while (item := await run_io_bound(_next_streamed_item, items, future)) is not None:
+                    yield item
+                # Propaga el error del generador, si lo hubo
+                await asyncio.wrap_future(future)
+            finally:
+                # Si el consumidor abandona (cancelación), el proceso deja de decodificar
+                stop.set()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+_whisper_pool: Optional[WhisperPool] = None
+
+
+def configure_whisper_pool(size: int, cpu_threads: int) -> WhisperPool:
+    global _whisper_pool
+    if _whisper_pool is not None:
+        _whisper_pool.shutdown()
+    _whisper_pool = WhisperPool(size, cpu_threads)
+    return _whisper_pool
+
+
+def get_whisper_pool() -> WhisperPool:
+    if _whisper_pool is None:
+        return configure_whisper_pool(*_default_pool_config())
+    return _whisper_pool
+
+
+def start_background_preload() -> Optional[threading.Thread]:
+    if not PRELOAD_WHISPER_AT_STARTUP:
+        return None
+    thread = threading.Thread(target=get_whisper_pool().preload, name="whisper-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_whisper_ready() -> bool:
+    """Sin precarga el modelo se carga en la primera petición, así que la app se considera lista."""
+    return not PRELOAD_WHISPER_AT_STARTUP or get_whisper_pool().status == "ready"
+
+
+def shutdown_whisper_pool() -> None:
+    if _whisper_pool is not None:
+        _whisper_pool.shutdown()
+
+
+WHISPER_POOL_WAIT_SECONDS = Histogram(
+    "whisper_pool_wait_seconds", "Tiempo de espera de un job hasta obtener una instancia de Whisper."
+)
+WHISPER_POOL_INSTANCES = Gauge("whisper_pool_instances", "Instancias de Whisper por estado.", ("state",))
+
+
+def _collect_whisper_pool_metrics() -> None:
+    if _whisper_pool is None:
+        return
+    WHISPER_POOL_INSTANCES.set(_whisper_pool.capacity, state="total")
+    WHISPER_POOL_INSTANCES.set(_whisper_pool.in_use, state="busy")
+    WHISPER_POOL_INSTANCES.set(_whisper_pool.waiting, state="queued_jobs")
+
+
+register_collector(_collect_whisper_pool_metrics, WHISPER_POOL_WAIT_SECONDS, WHISPER_POOL_INSTANCES)
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import json
+import random
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubTranslationServer:
+    """Imita el endpoint JSON de Google Translate para pruebas y benchmarks sin red.
+
+    Traduce anteponiendo `[tl]` al texto, añade latencia configurable y responde 503 o 429
+    con la probabilidad indicada para ejercitar los reintentos del cliente. Con `fail_first`,
+    además, los primeros intentos de cada texto fallan siempre (reintentos reproducibles).
+    """
+
+    def __init__(self, latency: float = 0.1, failure_rate: float = 0.0, fail_first: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.attempts_by_text: dict[str, int] = {}
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _translate(self, query: dict[str, list[str]]) -> bytes:
+        target = query.get("tl", ["es"])[0]
+        text = query.get("q", [""])[0]
+        return json.dumps([[[f"[{target}] {text}", text, None, None]], None, query.get("sl", ["en"])[0]]).encode()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    return
+                request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+                _method, target, _version = request_line.split(" ", 2)
+                query = parse_qs(urlsplit(target).query)
+                text = query.get("q", [""])[0]
+                attempt = self.attempts_by_text.get(text, 0) + 1
+                self.attempts_by_text[text] = attempt
+
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    await asyncio.sleep(self.latency)
+                finally:
+                    self.in_flight -= 1
+
+                if attempt <= self.fail_first or random.random() < self.failure_rate:
+                    self.failures += 1
+                    status, body = random.choice(["503 Service Unavailable", "429 Too Many Requests"]), b"{}"
+                else:
+                    status, body = "200 OK", self._translate(query)
+
+                headers = (
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: keep-alive\r\n\r\n"
+                )
+                writer.write(headers.encode("ascii") + body)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def _serve(host: str, port: int, latency: float, failure_rate: float, fail_first: int) -> None:
+    stub = StubTranslationServer(latency=latency, failure_rate=failure_rate, fail_first=fail_first)
+    server = await stub.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"🧪 Traductor stub en http://{address[0]}:{address[1]}/translate_a/single")
+    print(f"   GOOGLE_TRANSLATE_URL=http://{address[0]}:{address[1]}/translate_a/single")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita Google Translate")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.1, help="Latencia por petición en segundos")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probabilidad de responder 503/429")
+    parser.add_argument("--fail-first", type=int, default=0, help="Intentos iniciales de cada texto que fallan")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args.host, args.port, args.latency, args.failure_rate, args.fail_first))
+    except KeyboardInterrupt:
+        print("\n👋 Traductor stub detenido")
+
+
+if __name__ == "__main__":
+    main()
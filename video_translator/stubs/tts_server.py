@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import json
+import random
+
+from video_translator.utils.shared.ffmpeg_runner import run_ffmpeg
+
+
+# Velocidad aproximada de habla para calcular la duración del audio falso
+CHARS_PER_SECOND = 15
+
+
+class StubTTSServer:
+    """Servidor TTS falso para pruebas de carga sin red.
+
+    Responde a POST con {"text", "voice"} un MP3 de silencio de duración proporcional al texto,
+    en el mismo formato que edge-tts (24 kHz mono, 48 kbps), con latencia y fallos configurables.
+    Con `fail_first`, los primeros intentos de cada texto fallan siempre (reintentos reproducibles).
+    """
+
+    def __init__(self, latency: float = 0.3, failure_rate: float = 0.0, fail_first: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.attempts_by_text: dict[str, int] = {}
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._audio_by_duration: dict[float, bytes] = {}
+
+    async def _silence(self, text: str) -> bytes:
+        duration = max(0.5, round(len(text) / CHARS_PER_SECOND, 1))
+        if duration not in self._audio_by_duration:
+            self._audio_by_duration[duration] = await run_ffmpeg(
+                [
+                    "-f", "lavfi", "-i", "anullsrc=r=24000:cl=mono",
+                    "-t", str(duration),
+                    "-c:a", "libmp3lame", "-b:a", "48k",
+                    "-f", "mp3", "pipe:1",
+                ],
+                capture_stdout=True,
+                error_message="Error generando audio falso",
+            )
+        return self._audio_by_duration[duration]
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: str, content_type: str, body: bytes) -> None:
+        headers = (
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        writer.write(headers.encode("ascii") + body)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    return
+                content_length = 0
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    name, _, value = line.partition(":")
+                    if name.strip().lower() == "content-length":
+                        content_length = int(value.strip())
+                payload = json.loads(await reader.readexactly(content_length) or b"{}")
+                text = payload.get("text", "")
+                attempt = self.attempts_by_text.get(text, 0) + 1
+                self.attempts_by_text[text] = attempt
+
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    await asyncio.sleep(self.latency)
+                    if attempt <= self.fail_first or random.random() < self.failure_rate:
+                        self.failures += 1
+                        await self._respond(writer, "503 Service Unavailable", "text/plain", b"fallo simulado")
+                        continue
+                    audio = await self._silence(text)
+                finally:
+                    self.in_flight -= 1
+                await self._respond(writer, "200 OK", "audio/mpeg", audio)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def _serve(host: str, port: int, latency: float, failure_rate: float, fail_first: int) -> None:
+    stub = StubTTSServer(latency=latency, failure_rate=failure_rate, fail_first=fail_first)
+    server = await stub.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"🧪 TTS stub en http://{address[0]}:{address[1]}/synthesize")
+    print(f"   TTS_SERVER_URL=http://{address[0]}:{address[1]}/synthesize")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor TTS local que devuelve MP3 de silencio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.3, help="Latencia por petición en segundos")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probabilidad de responder 503")
+    parser.add_argument("--fail-first", type=int, default=0, help="Intentos iniciales de cada texto que fallan")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args.host, args.port, args.latency, args.failure_rate, args.fail_first))
+    except KeyboardInterrupt:
+        print("\n👋 TTS stub detenido")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
-from .safe_remove import safe_remove
+from .safe_remove import safe_remove, safe_remove_dir
+from .job_checkpoint_dir import job_checkpoint_dir
 from .cleanup_job_files import cleanup_job_files
 from .process_job_on_render import process_job_on_render
+from .sweep_expired_leases import sweep_expired_leases
@@ -1,8 +1,10 @@
-from .safe_remove import safe_remove
+from .job_checkpoint_dir import job_checkpoint_dir
+from .safe_remove import safe_remove, safe_remove_dir
 from video_translator.models.job import delete_job
 from typing import Optional
 
 def cleanup_job_files(job_id: str, output_path: Optional[str], input_path: Optional[str]) -> None:
     safe_remove(output_path)
     safe_remove(input_path)
+    safe_remove_dir(job_checkpoint_dir(job_id))
     delete_job(job_id)
@@ -0,0 +1,12 @@
+from pathlib import Path
+
+JOBS_DIR = Path(__file__).parent.parent.parent.parent / "jobs_data"
+
+
+def job_checkpoint_dir(job_id: str) -> str:
+    """Directorio de checkpoints del fallback de Render para un job.
+
+    Es la única ruta de checkpoints que el servidor crea y borra: la que reportan los workers
+    remotos es de otra máquina y nunca se usa para borrar nada aquí.
+    """
+    return str(JOBS_DIR / f"{job_id}_checkpoint")
@@ -1,11 +1,43 @@
+import asyncio
 import os
-import tempfile
-from video_translator.services.media_service import extract_audio, replace_audio, get_video_duration
-from video_translator.services.transcription_service import transcribe_audio
+import uuid
+from contextlib import suppress
+from functools import partial
+from video_translator.services.media_service import extract_audio, replace_audio, replace_audio_stream
+from video_translator.services.transcription_service import transcribe_audio, transcribe_segments
 from video_translator.services.translation_service import translate_text
-from video_translator.services.tts_service import generate_audio
-from video_translator.models.job import get_job, update_job_status, JobStatus
-from .safe_remove import safe_remove
+from video_translator.services.tts_service import generate_audio, stream_audio
+from video_translator.models.job import (
+    JOB_LEASE_SECONDS,
+    JobStatus,
+    finish_job,
+    get_job,
+    renew_job_lease,
+    update_job_checkpoint,
+)
+from video_translator.utils.shared.video_pipeline import process_video_pipeline
+from .job_checkpoint_dir import job_checkpoint_dir
+from .safe_remove import safe_remove, safe_remove_dir
+
+
+async def _keep_lease(job_id: str, worker_id: str, pipeline: asyncio.Task) -> None:
+    """Renueva el lease mientras el fallback procesa; si lo pierde, cancela el pipeline y retorna.
+
+    La renovación usa el executor por defecto del loop y no el pool de I/O del pipeline, que puede
+    estar ocupado con ffmpeg más tiempo que el lease.
+    """
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 4)
+        try:
+            renewed = await asyncio.to_thread(renew_job_lease, job_id, worker_id)
+        except Exception as error:
+            print(f"⚠️  No se pudo renovar el lease del job {job_id}: {error}")
+            continue
+        if not renewed:
+            print(f"🛑 Lease del job {job_id} perdido: otro worker lo retoma, se cancela el fallback")
+            pipeline.cancel()
+            return
+
 
 async def process_job_on_render(job_id: str):
     worker_id = "render-fallback"
@@ -14,35 +46,57 @@ async def process_job_on_render(job_id: str):
         return
     input_path = job.get("input_path")
     if not input_path or not os.path.exists(input_path):
-        update_job_status(
-            job_id,
-            JobStatus.FAILED,
-            error_message="Archivo de entrada no encontrado para fallback",
-            worker_id=worker_id,
-        )
+        finish_job(job_id, worker_id, JobStatus.FAILED, error_message="Archivo de entrada no encontrado para fallback")
         return
-    output_path = os.path.join(os.path.dirname(input_path), f"{job_id}_output.mp4")
-    with tempfile.NamedTemporaryFile(suffix=".aac", delete=False) as temp_audio, tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_output_audio:
+    # Rutas propias de este intento: si el lease pasa a otro worker, nunca se pisa ni borra su resultado
+    attempt = uuid.uuid4().hex
+    jobs_dir = os.path.dirname(input_path)
+    output_path = os.path.join(jobs_dir, f"{job_id}_output.{attempt}.mp4")
+    partial_path = os.path.join(jobs_dir, f"{job_id}_output.{attempt}.part.mp4")
+    # Los checkpoints se conservan si falla, para que un requeue retome desde la última etapa
+    checkpoint_dir = job_checkpoint_dir(job_id)
+
+    def on_checkpoint(stage: str) -> None:
+        update_job_checkpoint(job_id, checkpoint_dir, stage)
+
+    pipeline = asyncio.create_task(
+        process_video_pipeline(
+            input_path,
+            partial_path,
+            extract_audio,
+            transcribe_audio,
+            partial(translate_text, backend=job.get("translation_backend")),
+            generate_audio,
+            replace_audio,
+            transcribe_segments=transcribe_segments,
+            checkpoint_dir=checkpoint_dir,
+            on_checkpoint=on_checkpoint,
+            stream_audio=stream_audio,
+            replace_audio_stream=replace_audio_stream,
+        )
+    )
+    heartbeat = asyncio.create_task(_keep_lease(job_id, worker_id, pipeline))
+    try:
         try:
-            extract_audio(input_path, temp_audio.name)
-            transcribed_text = transcribe_audio(temp_audio.name)
-            translated_text = translate_text(transcribed_text)
-            await generate_audio(translated_text, temp_output_audio.name)
-            replace_audio(input_path, temp_output_audio.name, output_path)
-            update_job_status(job_id, JobStatus.COMPLETED, output_path=output_path, worker_id=worker_id)
-            safe_remove(input_path)
-        except Exception as error:
-            update_job_status(
-                job_id,
-                JobStatus.FAILED,
-                error_message=f"Fallback Render falló: {error}",
-                worker_id=worker_id,
-            )
-            if os.path.exists(output_path):
-                os.remove(output_path)
+            await pipeline
+        except asyncio.CancelledError:
+            # Si la cancelación no vino de _keep_lease (p. ej. discard), se propaga
+            if not heartbeat.done():
+                raise
+            return
+
+        # El archivo queda completo antes de marcar el job: un polling nunca ve completed sin resultado
+        os.replace(partial_path, output_path)
+        if finish_job(job_id, worker_id, JobStatus.COMPLETED, output_path=output_path):
             safe_remove(input_path)
-        finally:
-            if os.path.exists(temp_audio.name):
-                os.remove(temp_audio.name)
-            if os.path.exists(temp_output_audio.name):
-                os.remove(temp_output_audio.name)
+            safe_remove_dir(checkpoint_dir)
+        else:
+            # El job ya es de otro worker: su input sigue haciendo falta y este resultado sobra
+            safe_remove(output_path)
+    except Exception as error:
+        finish_job(job_id, worker_id, JobStatus.FAILED, error_message=f"Fallback Render falló: {error}")
+    finally:
+        heartbeat.cancel()
+        with suppress(asyncio.CancelledError):
+            await heartbeat
+        safe_remove(partial_path)
@@ -1 +1 @@
-from video_translator.utils.shared.files import safe_remove
+from video_translator.utils.shared.files import safe_remove, safe_remove_dir
@@ -0,0 +1,20 @@
+import asyncio
+import os
+
+from video_translator.models.job import reclaim_expired_jobs
+from video_translator.utils.shared.executors import run_io_bound
+
+# Cada cuántos segundos se buscan jobs en processing con el lease vencido
+JOB_LEASE_SWEEP_SECONDS = float(os.getenv("JOB_LEASE_SWEEP_SECONDS", "30"))
+
+
+async def sweep_expired_leases(interval: float = JOB_LEASE_SWEEP_SECONDS) -> None:
+    """Devuelve periódicamente a la cola los jobs de workers que murieron sin terminarlos."""
+    while True:
+        try:
+            requeued, failed = await run_io_bound(reclaim_expired_jobs)
+            if requeued or failed:
+                print(f"♻️  Leases vencidos: {requeued} job(s) reencolados, {failed} marcados como fallidos")
+        except Exception as error:
+            print(f"⚠️  Error al revisar leases vencidos: {error}")
+        await asyncio.sleep(interval)
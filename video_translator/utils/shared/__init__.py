@@ -1,3 +1,3 @@
-from .files import safe_remove
+from .files import safe_remove, safe_remove_dir
 from .yt_dlp_utils import extract_info_with_fallback, download_with_fallback
 from .video_pipeline import process_video_pipeline
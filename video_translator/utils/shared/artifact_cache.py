@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from .metrics import Gauge, register_collector
+
+
+CACHE_ROOT = Path(__file__).resolve().parents[3] / "cache_data"
+ARTIFACT_CACHE_ENABLED = os.getenv("ARTIFACT_CACHE", "1") == "1"
+ARTIFACT_CACHE_DIR = Path(os.getenv("ARTIFACT_CACHE_DIR", str(CACHE_ROOT / "artifacts")))
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def build_cache_key(*parts: Any) -> str:
+    """Clave estable a partir de las partes que determinan el artefacto (hash, modelo, idiomas, voz...)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Caché en disco direccionada por contenido con desalojo LRU.
+
+    El índice vive en SQLite para que varios procesos (web, pool de Whisper, workers)
+    compartan la misma caché y las mismas estadísticas de aciertos.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.directory / "index.db"
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS stats (
+                    kind TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.commit()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self._index_path), timeout=10.0)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def _path_for(self, kind: str, key: str) -> Path:
+        return self.directory / kind / key[:2] / key
+
+    def _record(self, conn: sqlite3.Connection, kind: str, hit: bool) -> None:
+        column = "hits" if hit else "misses"
+        conn.execute(
+            f"INSERT INTO stats (kind, {column}) VALUES (?, 1) "
+            f"ON CONFLICT(kind) DO UPDATE SET {column} = {column} + 1",
+            (kind,),
+        )
+
+    def get_path(self, kind: str, key: str) -> Optional[str]:
+        """Ruta del artefacto si está en caché (y lo marca como usado recientemente)."""
+        path = self._path_for(kind, key)
+        with self._connect() as conn:
+            row = conn.execute("SELECT size FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            hit = row is not None and path.exists()
+            if hit:
+                conn.execute(
+                    "UPDATE entries SET last_access = ? WHERE kind = ? AND key = ?",
+                    (time.time(), kind, key),
+                )
+            elif row is not None:
+                conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+            self._record(conn, kind, hit)
+            conn.commit()
+        return str(path) if hit else None
+
+    def put_bytes(self, kind: str, key: str, data: bytes) -> None:
+        path = self._path_for(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica: escribe a un temporal del mismo directorio y renombra
+        fd, temp_path = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                target.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._index(kind, key, len(data))
+
+    def get_bytes(self, kind: str, key: str) -> Optional[bytes]:
+        path = self.get_path(kind, key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            # Otro proceso lo desalojó entre la consulta y la lectura
+            return None
+
+    def get_json(self, kind: str, key: str) -> Any:
+        data = self.get_bytes(kind, key)
+        return json.loads(data) if data is not None else None
+
+    def put_json(self, kind: str, key: str, value: Any) -> None:
+        self.put_bytes(kind, key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def _index(self, kind: str, key: str, size: int) -> None:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                """
+                INSERT INTO entries (kind, key, size, last_access) VALUES (?, ?, ?, ?)
+                ON CONFLICT(kind, key) DO UPDATE SET size = excluded.size, last_access = excluded.last_access
+                """,
+                (kind, key, size, time.time()),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for kind, key, size in conn.execute(
+            "SELECT kind, key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            path = self._path_for(kind, key)
+            if path.exists():
+                path.unlink()
+            conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+            total -= size
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Aciertos, fallos, bytes y entradas por tipo de artefacto."""
+        with self._connect() as conn:
+            result: dict[str, dict[str, int]] = {}
+            for kind, hits, misses in conn.execute("SELECT kind, hits, misses FROM stats").fetchall():
+                result[kind] = {"hits": hits, "misses": misses, "bytes": 0, "entries": 0}
+            for kind, size, count in conn.execute(
+                "SELECT kind, SUM(size), COUNT(*) FROM entries GROUP BY kind"
+            ).fetchall():
+                entry = result.setdefault(kind, {"hits": 0, "misses": 0, "bytes": 0, "entries": 0})
+                entry["bytes"] = size
+                entry["entries"] = count
+        return result
+
+
+@lru_cache(maxsize=1)
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """Caché compartida del proceso, o None si ARTIFACT_CACHE=0."""
+    if not ARTIFACT_CACHE_ENABLED:
+        return None
+    return ArtifactCache(ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_BYTES)
+
+
+ARTIFACT_CACHE_HITS = Gauge("artifact_cache_hits", "Aciertos acumulados de la caché de artefactos.", ("kind",))
+ARTIFACT_CACHE_MISSES = Gauge("artifact_cache_misses", "Fallos acumulados de la caché de artefactos.", ("kind",))
+ARTIFACT_CACHE_HIT_RATIO = Gauge("artifact_cache_hit_ratio", "Proporción de aciertos de la caché de artefactos.", ("kind",))
+ARTIFACT_CACHE_BYTES = Gauge("artifact_cache_bytes", "Bytes ocupados por la caché de artefactos.", ("kind",))
+
+
+def _collect_artifact_cache_metrics() -> None:
+    cache = get_artifact_cache()
+    if cache is None:
+        return
+    for kind, entry in cache.stats().items():
+        lookups = entry["hits"] + entry["misses"]
+        ARTIFACT_CACHE_HITS.set(entry["hits"], kind=kind)
+        ARTIFACT_CACHE_MISSES.set(entry["misses"], kind=kind)
+        ARTIFACT_CACHE_HIT_RATIO.set(entry["hits"] / lookups if lookups else 0.0, kind=kind)
+        ARTIFACT_CACHE_BYTES.set(entry["bytes"], kind=kind)
+
+
+register_collector(
+    _collect_artifact_cache_metrics,
+    ARTIFACT_CACHE_HITS,
+    ARTIFACT_CACHE_MISSES,
+    ARTIFACT_CACHE_HIT_RATIO,
+    ARTIFACT_CACHE_BYTES,
+)
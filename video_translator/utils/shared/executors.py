@@ -0,0 +1,35 @@
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional
+
+
+# Hilos para etapas de I/O (ffmpeg, HTTP, yt-dlp); Whisper usa su propio pool de procesos
+PIPELINE_THREAD_WORKERS = int(os.getenv("PIPELINE_THREAD_WORKERS", "8"))
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=max(1, PIPELINE_THREAD_WORKERS),
+            thread_name_prefix="pipeline-io",
+        )
+    return _thread_pool
+
+
+async def run_io_bound(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Ejecuta una función bloqueante de I/O en el pool de hilos."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_thread_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_executors() -> None:
+    global _thread_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import re
+import signal
+from collections import deque
+from collections.abc import AsyncIterable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+FFMPEG_TIMEOUT_SECONDS = float(os.getenv("FFMPEG_TIMEOUT_SECONDS", "900"))
+FFPROBE_TIMEOUT_SECONDS = float(os.getenv("FFPROBE_TIMEOUT_SECONDS", "60"))
+STDERR_TAIL_LINES = 40
+
+# Recibe los segundos de media ya procesados por ffmpeg
+ProgressHook = Callable[[float], None]
+
+_progress_hook: ContextVar[Optional[ProgressHook]] = ContextVar("ffmpeg_progress_hook", default=None)
+_PROGRESS_LINE = re.compile(r"^([a-z_0-9]+)=(\S*)$")
+
+
+class FFmpegError(RuntimeError):
+    def __init__(self, message: str, returncode: Optional[int], stderr_tail: str):
+        super().__init__(f"{message}: {stderr_tail}" if stderr_tail else message)
+        self.returncode = returncode
+        self.stderr_tail = stderr_tail
+
+
+@contextmanager
+def ffmpeg_progress(hook: Optional[ProgressHook]) -> Iterator[None]:
+    """Asocia un hook de progreso a las llamadas de ffmpeg hechas dentro del bloque (misma tarea)."""
+    token = _progress_hook.set(hook)
+    try:
+        yield
+    finally:
+        _progress_hook.reset(token)
+
+
+def _kill_process_tree(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+async def _read_stderr(
+    stream: asyncio.StreamReader, tail: deque, on_progress: Optional[ProgressHook]
+) -> None:
+    while line := await stream.readline():
+        text = line.decode("utf-8", errors="replace").rstrip()
+        match = _PROGRESS_LINE.match(text)
+        if match is None:
+            # Solo se conservan las últimas líneas para el mensaje de error
+            if text:
+                tail.append(text)
+            continue
+        key, value = match.groups()
+        if on_progress and key == "out_time_us" and value.isdigit():
+            on_progress(int(value) / 1_000_000)
+
+
+async def _write_stdin(process: asyncio.subprocess.Process, chunks: AsyncIterable[bytes]) -> None:
+    stream = process.stdin
+    assert stream is not None
+    try:
+        async for chunk in chunks:
+            stream.write(chunk)
+            # drain aplica contrapresión: no se adelanta más audio del que ffmpeg consume
+            await stream.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        # ffmpeg cerró su entrada; el código de salida y stderr explican el motivo
+        return
+    except BaseException:
+        # Se mata antes de cualquier EOF: con stdin cerrado limpiamente ffmpeg terminaría y escribiría un
+        # archivo truncado pero con apariencia válida
+        _kill_process_tree(process)
+        raise
+    finally:
+        # Cierra el generador productor si ffmpeg terminó antes de consumirlo todo
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    # Solo una entrada completa termina en EOF
+    stream.close()
+
+
+async def _run(
+    command: list[str],
+    timeout: float,
+    capture_stdout: bool,
+    on_progress: Optional[ProgressHook],
+    error_message: str,
+    stdin_chunks: Optional[AsyncIterable[bytes]] = None,
+) -> bytes:
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.PIPE if stdin_chunks is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE if capture_stdout else asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        # Grupo de procesos propio para poder matar el árbol completo al cancelar
+        start_new_session=True,
+    )
+    tail: deque = deque(maxlen=STDERR_TAIL_LINES)
+    assert process.stderr is not None
+
+    async def communicate() -> bytes:
+        stderr_task = asyncio.create_task(_read_stderr(process.stderr, tail, on_progress))
+        stdin_task = (
+            asyncio.create_task(_write_stdin(process, stdin_chunks))
+            if stdin_chunks is not None and process.stdin is not None
+            else None
+        )
+        try:
+            if stdin_task is not None:
+                # Un error del productor (p. ej. un fragmento de TTS sin reintentos) mata ffmpeg antes de que
+                # finalice un archivo truncado y se propaga desde aquí
+                await stdin_task
+            stdout = await process.stdout.read() if process.stdout is not None else b""
+            await stderr_task
+            await process.wait()
+        finally:
+            for task in (stderr_task, stdin_task):
+                if task is not None and not task.done():
+                    task.cancel()
+        return stdout
+
+    try:
+        stdout = await asyncio.wait_for(communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        _kill_process_tree(process)
+        await process.wait()
+        raise FFmpegError(f"{error_message} (timeout de {timeout:g}s)", process.returncode, "\n".join(tail))
+    except BaseException:
+        _kill_process_tree(process)
+        await asyncio.shield(process.wait())
+        raise
+
+    if process.returncode != 0:
+        raise FFmpegError(f"{error_message} (código {process.returncode})", process.returncode, "\n".join(tail))
+    return stdout
+
+
+async def run_ffmpeg(
+    args: list[str],
+    *,
+    timeout: float = FFMPEG_TIMEOUT_SECONDS,
+    capture_stdout: bool = False,
+    error_message: str = "Error de ffmpeg",
+) -> bytes:
+    """Ejecuta ffmpeg sin bloquear el event loop.
+
+    Reporta el progreso de `-progress` al hook activo, aplica un timeout, mata el proceso si la
+    tarea se cancela y guarda solo las últimas líneas de stderr para los errores.
+    """
+    command = ["ffmpeg", "-hide_banner", "-nostdin", "-nostats", "-progress", "pipe:2", *args]
+    return await _run(command, timeout, capture_stdout, _progress_hook.get(), error_message)
+
+
+async def run_ffmpeg_with_input(
+    args: list[str],
+    stdin_chunks: AsyncIterable[bytes],
+    *,
+    timeout: float = FFMPEG_TIMEOUT_SECONDS,
+    error_message: str = "Error de ffmpeg",
+) -> None:
+    """Como run_ffmpeg, pero alimenta `pipe:0` con los bloques a medida que el productor los entrega.
+
+    No captura stdout: la salida debe ir a un archivo.
+    """
+    command = ["ffmpeg", "-hide_banner", "-nostats", "-progress", "pipe:2", *args]
+    await _run(command, timeout, False, _progress_hook.get(), error_message, stdin_chunks)
+
+
+async def run_ffprobe(
+    args: list[str],
+    *,
+    timeout: float = FFPROBE_TIMEOUT_SECONDS,
+    error_message: str = "Error de ffprobe",
+) -> bytes:
+    return await _run(["ffprobe", *args], timeout, True, None, error_message)
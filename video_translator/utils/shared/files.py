@@ -1,7 +1,13 @@
 import os
+import shutil
 from typing import Optional
 
 
 def safe_remove(path: Optional[str]) -> None:
     if path and os.path.exists(path):
         os.remove(path)
+
+
+def safe_remove_dir(path: Optional[str]) -> None:
+    if path and os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,57 @@
+import json
+import os
+from pathlib import Path
+
+
+CHECKPOINT_STAGES = ("extract_audio", "transcribe", "translate", "tts", "replace_audio")
+MANIFEST_NAME = "checkpoint.json"
+
+
+class PipelineCheckpoint:
+    """Guarda la salida de cada etapa del pipeline en un directorio por job.
+
+    El manifiesto registra qué etapas terminaron y dónde quedó su artefacto, de modo que
+    un reintento pueda retomar desde la última etapa completada.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._manifest_path = self.directory / MANIFEST_NAME
+        self._stages: dict[str, str] = self._load()
+
+    def _load(self) -> dict[str, str]:
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        stages = data.get("stages", {})
+        return {stage: str(artifact) for stage, artifact in stages.items() if stage in CHECKPOINT_STAGES}
+
+    def _save(self) -> None:
+        temp_path = self._manifest_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self._stages}, f)
+        os.replace(temp_path, self._manifest_path)
+
+    def path(self, name: str) -> str:
+        return str(self.directory / name)
+
+    def is_done(self, stage: str) -> bool:
+        artifact = self._stages.get(stage)
+        return artifact is not None and os.path.exists(artifact)
+
+    def mark_done(self, stage: str, artifact_path: str) -> None:
+        self._stages[stage] = artifact_path
+        self._save()
+
+    def read_text(self, stage: str) -> str:
+        with open(self._stages[stage], encoding="utf-8") as f:
+            return f.read()
+
+    def write_text(self, name: str, text: str) -> str:
+        path = self.path(name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
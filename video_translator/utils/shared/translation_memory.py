@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from .artifact_cache import CACHE_ROOT
+from .metrics import Gauge, register_collector
+
+
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY", "1") == "1"
+TRANSLATION_MEMORY_PATH = Path(os.getenv("TRANSLATION_MEMORY_PATH", str(CACHE_ROOT / "translation_memory.db")))
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "200000"))
+
+
+class TranslationMemory:
+    """Traducciones por oración en SQLite, compartidas entre procesos, con desalojo LRU por entradas."""
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS memory (
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (source_lang, target_lang, source)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_last_access ON memory(last_access)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("INSERT OR IGNORE INTO stats (id) VALUES (1)")
+            conn.commit()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self.path), timeout=10.0)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, sentences: list[str], source_lang: str, target_lang: str) -> dict[str, str]:
+        """Traducciones conocidas de las oraciones (ya normalizadas), marcándolas como usadas."""
+        unique = list(dict.fromkeys(sentences))
+        found: dict[str, str] = {}
+        with self._connect() as conn:
+            # Consultas por bloques para no superar el límite de parámetros de SQLite
+            for start in range(0, len(unique), 500):
+                batch = unique[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT source, translation FROM memory "
+                    f"WHERE source_lang = ? AND target_lang = ? AND source IN ({placeholders})",
+                    (source_lang, target_lang, *batch),
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE memory SET last_access = ? WHERE source_lang = ? AND target_lang = ? AND source = ?",
+                    [(now, source_lang, target_lang, source) for source in found],
+                )
+            conn.execute(
+                "UPDATE stats SET hits = hits + ?, misses = misses + ? WHERE id = 1",
+                (len(found), len(unique) - len(found)),
+            )
+            conn.commit()
+        return found
+
+    def store(self, translations: dict[str, str], source_lang: str, target_lang: str) -> None:
+        if not translations:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                """
+                INSERT INTO memory (source_lang, target_lang, source, translation, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(source_lang, target_lang, source)
+                DO UPDATE SET translation = excluded.translation, last_access = excluded.last_access
+                """,
+                [(source_lang, target_lang, source, translation, now) for source, translation in translations.items()],
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM memory WHERE rowid IN (SELECT rowid FROM memory ORDER BY last_access ASC LIMIT ?)",
+                    (excess,),
+                )
+            conn.commit()
+
+    def stats(self) -> dict[str, int]:
+        with self._connect() as conn:
+            hits, misses = conn.execute("SELECT hits, misses FROM stats WHERE id = 1").fetchone()
+            entries = conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+        return {"hits": hits, "misses": misses, "entries": entries}
+
+
+@lru_cache(maxsize=1)
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """Memoria de traducción del proceso, o None si TRANSLATION_MEMORY=0."""
+    if not TRANSLATION_MEMORY_ENABLED:
+        return None
+    return TranslationMemory(TRANSLATION_MEMORY_PATH, TRANSLATION_MEMORY_MAX_ENTRIES)
+
+
+TRANSLATION_MEMORY_HITS = Gauge("translation_memory_hits", "Oraciones encontradas en la memoria de traducción.")
+TRANSLATION_MEMORY_MISSES = Gauge("translation_memory_misses", "Oraciones que hubo que traducir.")
+TRANSLATION_MEMORY_ENTRIES = Gauge("translation_memory_entries", "Oraciones guardadas en la memoria de traducción.")
+
+
+def _collect_translation_memory_metrics() -> None:
+    memory = get_translation_memory()
+    if memory is None:
+        return
+    stats = memory.stats()
+    TRANSLATION_MEMORY_HITS.set(stats["hits"])
+    TRANSLATION_MEMORY_MISSES.set(stats["misses"])
+    TRANSLATION_MEMORY_ENTRIES.set(stats["entries"])
+
+
+register_collector(
+    _collect_translation_memory_metrics,
+    TRANSLATION_MEMORY_HITS,
+    TRANSLATION_MEMORY_MISSES,
+    TRANSLATION_MEMORY_ENTRIES,
+)
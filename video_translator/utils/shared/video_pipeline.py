@@ -1,20 +1,171 @@
+import asyncio
 import inspect
 import os
 import tempfile
-from collections.abc import Callable
+import time
+from collections.abc import AsyncIterator, Callable
 from typing import Any
 
+from .executors import run_io_bound
+from .ffmpeg_runner import ProgressHook, ffmpeg_progress
+from .metrics import PIPELINE_STAGE_SECONDS
+from .pipeline_checkpoint import PipelineCheckpoint
+
 
 StepHook = Callable[[str, str | None], None]
 
+# Modo streaming: los segmentos de Whisper fluyen por colas acotadas hacia traducción y TTS
+STREAMING_PIPELINE = os.getenv("STREAMING_PIPELINE", "0") == "1"
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "8"))
+STREAM_CHUNK_MAX_CHARS = 500
+# Modo de ensamblado en streaming: el audio TTS entra por stdin a ffmpeg mientras se sintetiza
+STREAMING_MUX = os.getenv("STREAMING_MUX", "0") == "1"
+
+_END_OF_STREAM = object()
+
 
 async def _maybe_await(func: Callable[..., Any], *args: Any) -> Any:
-    result = func(*args)
+    """Ejecuta una etapa sin bloquear el event loop: las síncronas van al pool de hilos."""
+    if inspect.iscoroutinefunction(func):
+        return await func(*args)
+    result = await run_io_bound(func, *args)
     if inspect.isawaitable(result):
         return await result
     return result
 
 
+def _emit(on_step: StepHook | None, step: str, payload: str | None = None) -> None:
+    if on_step:
+        on_step(step, payload)
+
+
+def _progress_hook(on_step: StepHook | None, stage: str) -> ProgressHook | None:
+    if not on_step:
+        return None
+    return lambda seconds: on_step(f"{stage}:progress", f"{seconds:.1f}")
+
+
+def _drain_chunk(queue: asyncio.Queue, first: str) -> tuple[str, bool]:
+    """Agrupa el primer elemento con los que ya esperan en la cola, sin bloquear."""
+    parts = [first]
+    size = len(first)
+    while size < STREAM_CHUNK_MAX_CHARS and not queue.empty():
+        item = queue.get_nowait()
+        if item is _END_OF_STREAM:
+            return "\n".join(parts), True
+        parts.append(item)
+        size += len(item) + 1
+    # Un segmento por línea para que el troceado de la traducción respete sus límites
+    return "\n".join(parts), False
+
+
+async def _iterate_segments(segments: Any) -> AsyncIterator[Any]:
+    """Recorre un generador asíncrono tal cual; uno síncrono avanza en el pool de hilos."""
+    if hasattr(segments, "__aiter__"):
+        async for segment in segments:
+            yield segment
+        return
+    iterator = iter(segments)
+    while (segment := await run_io_bound(next, iterator, _END_OF_STREAM)) is not _END_OF_STREAM:
+        yield segment
+
+
+async def _run_streaming_stages(
+    audio: Any,
+    output_audio_path: str,
+    transcribe_segments: Callable[..., Any],
+    translate_text: Callable[..., Any],
+    generate_audio: Callable[..., Any],
+    on_step: StepHook | None,
+) -> tuple[str, str]:
+    """Ejecuta transcripción, traducción y TTS solapadas; retorna (transcripción, traducción)."""
+    segments_queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    translated_queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    transcribed_parts: list[str] = []
+    translated_parts: list[str] = []
+
+    # En streaming las etapas se solapan: se registra el tiempo ocupado de cada una, no la espera en colas
+    async def transcribe_stage() -> None:
+        with PIPELINE_STAGE_SECONDS.time(stage="transcribe"):
+            await _transcribe_segments()
+
+    async def _transcribe_segments() -> None:
+        _emit(on_step, "transcribe:start")
+        async for segment in _iterate_segments(transcribe_segments(audio)):
+            _emit(on_step, "transcribe:segment", f"[{len(transcribed_parts)}] {segment}"[:100])
+            transcribed_parts.append(segment)
+            await segments_queue.put(segment)
+        if not transcribed_parts:
+            raise ValueError("El texto transcrito está vacío. Verifica el audio de entrada.")
+        _emit(on_step, "transcribe:done", " ".join(transcribed_parts)[:100])
+        await segments_queue.put(_END_OF_STREAM)
+
+    async def translate_stage() -> None:
+        busy_seconds = 0.0
+        finished = False
+        while not finished:
+            item = await segments_queue.get()
+            if item is _END_OF_STREAM:
+                break
+            chunk, finished = _drain_chunk(segments_queue, item)
+            if not translated_parts:
+                _emit(on_step, "translate:start")
+            started = time.perf_counter()
+            translated = await _maybe_await(translate_text, chunk)
+            busy_seconds += time.perf_counter() - started
+            _emit(on_step, "translate:segment", f"[{len(translated_parts)}] {translated}"[:100])
+            translated_parts.append(translated)
+            await translated_queue.put(translated)
+        PIPELINE_STAGE_SECONDS.observe(busy_seconds, stage="translate")
+        _emit(on_step, "translate:done", " ".join(translated_parts)[:100])
+        await translated_queue.put(_END_OF_STREAM)
+
+    async def tts_stage(parts_dir: str) -> list[str]:
+        part_paths: list[str] = []
+        busy_seconds = 0.0
+        finished = False
+        while not finished:
+            item = await translated_queue.get()
+            if item is _END_OF_STREAM:
+                break
+            chunk, finished = _drain_chunk(translated_queue, item)
+            if not part_paths:
+                _emit(on_step, "tts:start")
+            part_path = os.path.join(parts_dir, f"part_{len(part_paths):04d}.mp3")
+            started = time.perf_counter()
+            await _maybe_await(generate_audio, chunk, part_path)
+            busy_seconds += time.perf_counter() - started
+            _emit(on_step, "tts:segment", f"[{len(part_paths)}] {chunk}"[:100])
+            part_paths.append(part_path)
+        PIPELINE_STAGE_SECONDS.observe(busy_seconds, stage="tts")
+        return part_paths
+
+    with tempfile.TemporaryDirectory() as parts_dir:
+        tasks = [
+            asyncio.create_task(transcribe_stage()),
+            asyncio.create_task(translate_stage()),
+            asyncio.create_task(tts_stage(parts_dir)),
+        ]
+        try:
+            _, _, part_paths = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        # Cada fragmento de varias oraciones sale del muxer mp3 de ffmpeg con su propia cabecera ID3 y
+        # frame Xing; el demuxer concat las descarta en vez de dejarlas a mitad del flujo
+        from video_translator.services.media_service import concat_audio
+
+        if part_paths:
+            await concat_audio(part_paths, output_audio_path)
+        else:
+            open(output_audio_path, "wb").close()
+
+    return " ".join(transcribed_parts), " ".join(translated_parts)
+
+
 async def process_video_pipeline(
     input_path: str,
     output_path: str,
@@ -24,38 +175,116 @@ async def process_video_pipeline(
     generate_audio: Callable[..., Any],
     replace_audio: Callable[..., Any],
     on_step: StepHook | None = None,
+    transcribe_segments: Callable[..., Any] | None = None,
+    streaming: bool | None = None,
+    checkpoint_dir: str | None = None,
+    on_checkpoint: Callable[[str], Any] | None = None,
+    stream_audio: Callable[..., Any] | None = None,
+    replace_audio_stream: Callable[..., Any] | None = None,
+    stream_mux: bool | None = None,
 ) -> None:
-    with tempfile.NamedTemporaryFile(suffix=".aac", delete=False) as temp_audio, tempfile.NamedTemporaryFile(
-        suffix=".mp3", delete=False
-    ) as temp_output_audio:
-        try:
-            if on_step:
-                on_step("extract_audio:start", None)
-            await _maybe_await(extract_audio, input_path, temp_audio.name)
-
-            if on_step:
-                on_step("transcribe:start", None)
-            transcribed_text = await _maybe_await(transcribe_audio, temp_audio.name)
-            if on_step:
-                on_step("transcribe:done", str(transcribed_text)[:100])
-
-            if on_step:
-                on_step("translate:start", None)
-            translated_text = await _maybe_await(translate_text, transcribed_text)
-            if on_step:
-                on_step("translate:done", str(translated_text)[:100])
-
-            if on_step:
-                on_step("tts:start", None)
-            await _maybe_await(generate_audio, translated_text, temp_output_audio.name)
-
-            if on_step:
-                on_step("replace_audio:start", None)
-            await _maybe_await(replace_audio, input_path, temp_output_audio.name, output_path)
-            if on_step:
-                on_step("pipeline:done", None)
-        finally:
-            if os.path.exists(temp_audio.name):
-                os.remove(temp_audio.name)
-            if os.path.exists(temp_output_audio.name):
-                os.remove(temp_output_audio.name)
+    if streaming is None:
+        streaming = STREAMING_PIPELINE
+    if streaming and transcribe_segments is None:
+        raise ValueError("El modo streaming requiere una función transcribe_segments")
+    if stream_mux is None:
+        stream_mux = STREAMING_MUX and stream_audio is not None and replace_audio_stream is not None
+    if stream_mux and (stream_audio is None or replace_audio_stream is None):
+        raise ValueError("El ensamblado en streaming requiere stream_audio y replace_audio_stream")
+
+    # Con checkpoint_dir las salidas intermedias sobreviven al job y un reintento retoma desde ahí
+    checkpoint = PipelineCheckpoint(checkpoint_dir) if checkpoint_dir else None
+
+    async def stage_done(stage: str, artifact_path: str) -> None:
+        if checkpoint is None:
+            return
+        checkpoint.mark_done(stage, artifact_path)
+        if on_checkpoint:
+            await _maybe_await(on_checkpoint, stage)
+
+    def resumed(stage: str) -> bool:
+        if checkpoint is not None and checkpoint.is_done(stage):
+            _emit(on_step, "checkpoint:resume", stage)
+            return True
+        return False
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        stage_dir = str(checkpoint.directory) if checkpoint else work_dir
+        audio_path = os.path.join(stage_dir, "audio.aac")
+        output_audio_path = os.path.join(stage_dir, "tts.mp3")
+
+        # El audio solo hace falta si la transcripción no quedó guardada en un checkpoint
+        audio_input: Any = audio_path
+        muxed = False
+        needs_audio = checkpoint is None or not checkpoint.is_done("tts" if streaming else "transcribe")
+        if needs_audio and not resumed("extract_audio"):
+            _emit(on_step, "extract_audio:start")
+            with PIPELINE_STAGE_SECONDS.time(stage="extract_audio"), ffmpeg_progress(
+                _progress_hook(on_step, "extract_audio")
+            ):
+                extracted = await _maybe_await(extract_audio, input_path, audio_path)
+            if extracted is None:
+                await stage_done("extract_audio", audio_path)
+            else:
+                # Audio PCM en memoria: se pasa directo a Whisper y no se guarda en disco
+                audio_input = extracted
+
+        if streaming and not resumed("tts"):
+            transcribed_text, translated_text = await _run_streaming_stages(
+                audio_input,
+                output_audio_path,
+                transcribe_segments,
+                translate_text,
+                generate_audio,
+                on_step,
+            )
+            if checkpoint is not None:
+                await stage_done("transcribe", checkpoint.write_text("transcript.txt", transcribed_text))
+                await stage_done("translate", checkpoint.write_text("translation.txt", translated_text))
+            await stage_done("tts", output_audio_path)
+        elif not streaming:
+            if resumed("transcribe") and checkpoint is not None:
+                transcribed_text = checkpoint.read_text("transcribe")
+            else:
+                _emit(on_step, "transcribe:start")
+                with PIPELINE_STAGE_SECONDS.time(stage="transcribe"):
+                    transcribed_text = await _maybe_await(transcribe_audio, audio_input)
+                _emit(on_step, "transcribe:done", str(transcribed_text)[:100])
+                if checkpoint is not None:
+                    await stage_done("transcribe", checkpoint.write_text("transcript.txt", str(transcribed_text)))
+
+            if resumed("translate") and checkpoint is not None:
+                translated_text = checkpoint.read_text("translate")
+            else:
+                _emit(on_step, "translate:start")
+                with PIPELINE_STAGE_SECONDS.time(stage="translate"):
+                    translated_text = await _maybe_await(translate_text, transcribed_text)
+                _emit(on_step, "translate:done", str(translated_text)[:100])
+                if checkpoint is not None:
+                    await stage_done("translate", checkpoint.write_text("translation.txt", str(translated_text)))
+
+            # Un tts.mp3 ya guardado en un checkpoint se reutiliza en lugar de sintetizar de nuevo
+            if stream_mux and not (checkpoint is not None and checkpoint.is_done("tts")):
+                if not resumed("replace_audio"):
+                    _emit(on_step, "tts:start")
+                    _emit(on_step, "replace_audio:start")
+                    with PIPELINE_STAGE_SECONDS.time(stage="tts_mux"), ffmpeg_progress(
+                        _progress_hook(on_step, "replace_audio")
+                    ):
+                        await replace_audio_stream(input_path, stream_audio(translated_text), output_path)
+                    await stage_done("replace_audio", output_path)
+                muxed = True
+            elif not resumed("tts"):
+                _emit(on_step, "tts:start")
+                with PIPELINE_STAGE_SECONDS.time(stage="tts"):
+                    await _maybe_await(generate_audio, translated_text, output_audio_path)
+                await stage_done("tts", output_audio_path)
+
+        if not muxed and not resumed("replace_audio"):
+            _emit(on_step, "replace_audio:start")
+            with PIPELINE_STAGE_SECONDS.time(stage="replace_audio"), ffmpeg_progress(
+                _progress_hook(on_step, "replace_audio")
+            ):
+                await _maybe_await(replace_audio, input_path, output_audio_path, output_path)
+            await stage_done("replace_audio", output_path)
+        _emit(on_step, "pipeline:done")
@@ -1 +1,2 @@
-from .split_text import split_text
+from .normalize_text import normalize_sentence
+from .split_text import pack_sentences, split_sentences, split_text
@@ -0,0 +1,10 @@
+import re
+import unicodedata
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sentence(sentence: str) -> str:
+    """Forma canónica de una oración: Unicode NFKC y espacios colapsados."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", sentence)).strip()
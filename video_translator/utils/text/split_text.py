@@ -1,3 +1,84 @@
-def split_text(text: str, max_length: int = 500) -> list[str]:
-    """Divide un texto en partes de longitud máxima."""
-    return [text[i:i + max_length] for i in range(0, len(text), max_length)]
+import re
+from collections.abc import Iterable, Iterator, Sequence
+
+
+# Palabra que cierra una oración, con comillas o paréntesis de cierre opcionales
+_SENTENCE_END = re.compile(r"[.!?…][\"'»”’)\]]*$")
+
+
+def _sentences(segments: Iterable[str]) -> Iterator[str]:
+    """Oraciones de cada segmento; el final de un segmento siempre cierra la unidad."""
+    for segment in segments:
+        current: list[str] = []
+        for word in segment.split():
+            current.append(word)
+            if _SENTENCE_END.search(word):
+                yield " ".join(current)
+                current = []
+        if current:
+            yield " ".join(current)
+
+
+def split_sentences(text: str | Sequence[str]) -> list[str]:
+    """Oraciones de un texto (una línea por segmento) o de una lista de segmentos."""
+    return list(_sentences(text.splitlines() if isinstance(text, str) else text))
+
+
+def _fit(unit: str, max_length: int) -> Iterator[str]:
+    """Parte una unidad demasiado larga por palabras y, en último caso, por caracteres."""
+    if len(unit) <= max_length:
+        yield unit
+        return
+    current = ""
+    for word in unit.split(" "):
+        while len(word) > max_length:
+            if current:
+                yield current
+                current = ""
+            yield word[:max_length]
+            word = word[max_length:]
+        if current and len(current) + 1 + len(word) > max_length:
+            yield current
+            current = ""
+        current = f"{current} {word}" if current else word
+    if current:
+        yield current
+
+
+def pack_sentences(sentences: Iterable[str], max_length: int = 500) -> list[list[str]]:
+    """Agrupa oraciones de forma voraz en lotes de hasta `max_length` caracteres.
+
+    Cuenta un carácter de separación entre oraciones, así que sirve tanto para unirlas con un
+    espacio como con un salto de línea. Una oración más larga que `max_length` se parte antes por
+    palabras, de modo que ningún lote supera el límite.
+    """
+    batches: list[list[str]] = []
+    current: list[str] = []
+    current_length = 0
+
+    for sentence in sentences:
+        for piece in _fit(sentence, max_length):
+            added = len(piece) + (1 if current else 0)
+            if current and current_length + added > max_length:
+                batches.append(current)
+                current = []
+                current_length = 0
+                added = len(piece)
+            current.append(piece)
+            current_length += added
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def split_text(text: str | Sequence[str], max_length: int = 500) -> list[str]:
+    """Divide un texto en partes de longitud máxima sin cortar oraciones.
+
+    Acepta un texto (cada línea se trata como un segmento de Whisper) o la lista de segmentos.
+    Las oraciones se agrupan de forma voraz hasta `max_length`, de modo que se hacen las mínimas
+    peticiones y las mismas oraciones producen las mismas partes. Unir las partes con un espacio
+    reproduce el texto con los espacios normalizados, salvo palabras más largas que `max_length`.
+    """
+    segments = text.splitlines() if isinstance(text, str) else text
+    return [" ".join(batch) for batch in pack_sentences(_sentences(segments), max_length)]
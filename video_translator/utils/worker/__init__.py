@@ -1,10 +1,14 @@
-from .get_next_job import get_next_job
+from .get_next_job import get_next_job, get_next_jobs
 from .claim_job import claim_job
 from .mark_failed import mark_failed
 from .download_file_from_api import download_file_from_api
 from .process_and_translate import process_and_translate
-from .upload_file_to_api import upload_file_to_api
+from .upload_file_to_api import LeaseLostError, upload_file_to_api
 from .download_youtube_video import download_youtube_video
 from .cleanup_temp_files import cleanup_temp_files
 from .is_supported_youtube_url import is_supported_youtube_url
 from .get_youtube_duration import get_youtube_duration
+from .serve_metrics import serve_metrics
+from .report_checkpoint import report_checkpoint
+from .send_heartbeat import send_heartbeat
+from .prune_checkpoints import prune_checkpoints
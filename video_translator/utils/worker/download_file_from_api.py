@@ -1,5 +1,7 @@
 import httpx
 
+from video_translator.utils.shared.metrics import TRANSFERRED_BYTES
+
 async def download_file_from_api(client: httpx.AsyncClient, api_url: str, job_id: str, local_path: str) -> str:
     print("  ⬇️  Descargando video de entrada...")
     try:
@@ -8,6 +10,7 @@ async def download_file_from_api(client: httpx.AsyncClient, api_url: str, job_id
             with open(local_path, "wb") as f:
                 async for chunk in response.aiter_bytes(chunk_size=1024 * 1024):
                     f.write(chunk)
+                    TRANSFERRED_BYTES.inc(len(chunk), direction="download")
         print(f"  ✅ Descargado a {local_path}")
         return local_path
     except Exception as error:
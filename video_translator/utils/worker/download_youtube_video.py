@@ -1,3 +1,4 @@
+from video_translator.utils.shared.executors import run_io_bound
 from video_translator.utils.shared.yt_dlp_utils import download_with_fallback
 
 async def download_youtube_video(url: str, local_path: str) -> None:
@@ -11,7 +12,7 @@ async def download_youtube_video(url: str, local_path: str) -> None:
         "merge_output_format": "mp4",
     }
 
-    browser_used = download_with_fallback(url, ydl_opts)
+    browser_used = await run_io_bound(download_with_fallback, url, ydl_opts)
     if browser_used:
         print(f"  ✅ Descargado a {local_path} (usando cookies de {browser_used})")
         return
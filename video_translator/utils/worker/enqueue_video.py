@@ -1,7 +1,9 @@
 import shutil
 from fastapi import HTTPException
 from pathlib import Path
+from typing import Optional
 from video_translator.models.job import JobTarget, create_job
+from video_translator.services.translation_backends import is_translation_backend
 
 JOBS_DIR = Path(__file__).parent.parent.parent.parent / "jobs_data"
 JOBS_DIR.mkdir(exist_ok=True)
@@ -10,12 +12,15 @@ from video_translator.models.job import get_db
 from .validate_video_duration import validate_video_duration
 from .cleanup_temp_files import cleanup_temp_files
 
-def enqueue_video(temp_path: str, target: str) -> dict:
+async def enqueue_video(temp_path: str, target: str, translation_backend: Optional[str] = None) -> dict:
     if target not in (JobTarget.CLOUD, JobTarget.PC):
         cleanup_temp_files(temp_path)
         raise HTTPException(status_code=400, detail="Target inválido. Usa 'cloud' o 'pc'.")
-    validate_video_duration(temp_path)
-    job_id = create_job(temp_path, JobTarget(target))
+    if translation_backend and not is_translation_backend(translation_backend):
+        cleanup_temp_files(temp_path)
+        raise HTTPException(status_code=400, detail=f"Backend de traducción inválido: {translation_backend}")
+    await validate_video_duration(temp_path)
+    job_id = create_job(temp_path, JobTarget(target), translation_backend)
     saved_path = JOBS_DIR / f"{job_id}_input.mp4"
     shutil.move(temp_path, str(saved_path))
     with get_db() as conn:
@@ -10,3 +10,18 @@ async def get_next_job(client: httpx.AsyncClient, api_url: str, worker_id: str)
     except Exception as error:
         print(f"❌ Error al obtener job: {error}")
         return None
+
+
+async def get_next_jobs(client: httpx.AsyncClient, api_url: str, worker_id: str, max_jobs: int) -> list[dict]:
+    """Obtiene hasta `max_jobs` jobs pendientes en una sola petición."""
+    try:
+        response = await client.get(f"{api_url}/jobs/next", params={"worker_id": worker_id, "max_jobs": max_jobs})
+        response.raise_for_status()
+        data = response.json()
+        # Una API anterior solo devuelve "job"
+        if "jobs" in data:
+            return data["jobs"]
+        return [data["job"]] if data.get("job") else []
+    except Exception as error:
+        print(f"❌ Error al obtener jobs: {error}")
+        return []
@@ -1,19 +1,27 @@
 from video_translator.utils.shared.video_pipeline import process_video_pipeline
 
-async def process_and_translate(input_path: str, output_path: str, extract_audio, transcribe_audio, translate_text, generate_audio, replace_audio) -> None:
+async def process_and_translate(input_path: str, output_path: str, extract_audio, transcribe_audio, translate_text, generate_audio, replace_audio, transcribe_segments=None, checkpoint_dir=None, on_checkpoint=None, stream_audio=None, replace_audio_stream=None) -> None:
     def on_step(step: str, payload: str | None) -> None:
-        if step == "extract_audio:start":
+        if step == "checkpoint:resume" and payload is not None:
+            print(f"  ♻️  Retomando desde checkpoint: {payload}")
+        elif step == "extract_audio:start":
             print("  🎵 Extrayendo audio...")
         elif step == "transcribe:start":
             print("  🎤 Transcribiendo...")
         elif step == "transcribe:done" and payload is not None:
             print(f"  📝 Transcrito: {payload}...")
+        elif step == "transcribe:segment" and payload is not None:
+            print(f"    🎤 Segmento: {payload}")
         elif step == "translate:start":
             print("  🌐 Traduciendo...")
         elif step == "translate:done" and payload is not None:
             print(f"  ✅ Traducido: {payload}...")
+        elif step == "translate:segment" and payload is not None:
+            print(f"    🌐 Segmento traducido: {payload}")
         elif step == "tts:start":
             print("  🔊 Generando audio traducido...")
+        elif step == "tts:segment" and payload is not None:
+            print(f"    🔊 Audio generado: {payload}")
         elif step == "replace_audio:start":
             print("  🎬 Reemplazando audio en video...")
         elif step == "pipeline:done":
@@ -28,4 +36,9 @@ async def process_and_translate(input_path: str, output_path: str, extract_audio
         generate_audio,
         replace_audio,
         on_step=on_step,
+        transcribe_segments=transcribe_segments,
+        checkpoint_dir=checkpoint_dir,
+        on_checkpoint=on_checkpoint,
+        stream_audio=stream_audio,
+        replace_audio_stream=replace_audio_stream,
     )
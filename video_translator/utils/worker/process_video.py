@@ -2,7 +2,7 @@ from fastapi import HTTPException
 
 from video_translator.utils.shared.video_pipeline import process_video_pipeline
 
-async def process_video(input_path: str, output_path: str, extract_audio, transcribe_audio, translate_text, generate_audio, replace_audio) -> None:
+async def process_video(input_path: str, output_path: str, extract_audio, transcribe_audio, translate_text, generate_audio, replace_audio, transcribe_segments=None, stream_audio=None, replace_audio_stream=None) -> None:
     """
     Procesa un video: extrae audio, transcribe, traduce, genera audio traducido y reemplaza en el video.
     """
@@ -15,6 +15,9 @@ async def process_video(input_path: str, output_path: str, extract_audio, transc
             translate_text,
             generate_audio,
             replace_audio,
+            transcribe_segments=transcribe_segments,
+            stream_audio=stream_audio,
+            replace_audio_stream=replace_audio_stream,
         )
     except HTTPException:
         raise
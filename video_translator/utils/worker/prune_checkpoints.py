@@ -0,0 +1,37 @@
+import os
+import time
+
+from video_translator.utils.shared.files import safe_remove_dir
+
+
+def _last_modified(path: str) -> float:
+    latest = os.path.getmtime(path)
+    with os.scandir(path) as entries:
+        for entry in entries:
+            latest = max(latest, entry.stat().st_mtime)
+    return latest
+
+
+def prune_checkpoints(root: str, max_age_seconds: float) -> int:
+    """Borra los checkpoints de jobs que nadie retomó (fallidos sin requeue o reasignados a otro worker).
+
+    Se conservan los modificados hace menos de `max_age_seconds`; solo debe llamarse sin jobs en curso.
+    Retorna cuántos directorios se borraron.
+    """
+    if not os.path.isdir(root):
+        return 0
+
+    now = time.time()
+    removed = 0
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            try:
+                if now - _last_modified(entry.path) < max_age_seconds:
+                    continue
+            except OSError:
+                continue
+            safe_remove_dir(entry.path)
+            removed += 1
+    return removed
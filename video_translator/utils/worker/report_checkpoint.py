@@ -0,0 +1,14 @@
+import httpx
+
+async def report_checkpoint(
+    client: httpx.AsyncClient, api_url: str, job_id: str, worker_id: str, stage: str
+) -> None:
+    """Registra en la API la última etapa completada del job."""
+    try:
+        response = await client.post(
+            f"{api_url}/jobs/{job_id}/checkpoint",
+            params={"worker_id": worker_id, "stage": stage},
+        )
+        response.raise_for_status()
+    except Exception as error:
+        print(f"⚠️  No se pudo registrar el checkpoint {stage}: {error}")
@@ -0,0 +1,13 @@
+import httpx
+
+async def send_heartbeat(client: httpx.AsyncClient, api_url: str, job_id: str, worker_id: str) -> bool:
+    """Renueva el lease del job en la API. False si el job ya no es de este worker."""
+    try:
+        response = await client.post(f"{api_url}/jobs/{job_id}/heartbeat", params={"worker_id": worker_id})
+        if response.status_code == 409:
+            print(f"⚠️  El job {job_id} ya no está asignado a este worker (lease vencido)")
+            return False
+        response.raise_for_status()
+    except Exception as error:
+        print(f"⚠️  No se pudo renovar el lease del job {job_id}: {error}")
+    return True
@@ -0,0 +1,34 @@
+import asyncio
+
+from video_translator.utils.shared.metrics import render_metrics
+
+
+async def _handle_metrics_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        pass
+
+    body = render_metrics().encode("utf-8")
+    headers = (
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: text/plain; version=0.0.4\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    try:
+        writer.write(headers.encode("ascii") + body)
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve_metrics(port: int, host: str = "127.0.0.1") -> asyncio.AbstractServer | None:
+    """Expone las métricas del worker en formato Prometheus en un puerto local."""
+    try:
+        server = await asyncio.start_server(_handle_metrics_request, host, port)
+    except OSError as error:
+        print(f"⚠️  No se pudo abrir el puerto de métricas {port}: {error}")
+        return None
+    print(f"📊 Métricas en http://{host}:{port}/metrics")
+    return server
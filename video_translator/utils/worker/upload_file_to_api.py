@@ -1,17 +1,34 @@
+import os
+
 import httpx
 
-async def upload_file_to_api(client: httpx.AsyncClient, api_url: str, job_id: str, output_path: str) -> bool:
+from video_translator.utils.shared.metrics import TRANSFERRED_BYTES
+
+
+class LeaseLostError(Exception):
+    """La API rechazó el resultado porque el job ya pertenece a otro worker."""
+
+
+async def upload_file_to_api(
+    client: httpx.AsyncClient, api_url: str, job_id: str, worker_id: str, output_path: str
+) -> bool:
     print("  ⬆️  Subiendo resultado...")
     try:
         with open(output_path, "rb") as f:
             files = {"file": ("output.mp4", f, "video/mp4")}
             response = await client.post(
                 f"{api_url}/jobs/{job_id}/upload-result",
+                params={"worker_id": worker_id},
                 files=files,
             )
-            response.raise_for_status()
+        if response.status_code == 409:
+            raise LeaseLostError(f"El job {job_id} ya no está asignado a este worker (lease vencido)")
+        response.raise_for_status()
+        TRANSFERRED_BYTES.inc(os.path.getsize(output_path), direction="upload")
         print("  ✅ Resultado subido correctamente")
         return True
+    except LeaseLostError:
+        raise
     except Exception as error:
         print(f"❌ Error al subir resultado: {error}")
         return False
@@ -1,12 +1,12 @@
-import subprocess
 from fastapi import HTTPException
 from video_translator.services.media_service import get_video_duration
+from video_translator.utils.shared.ffmpeg_runner import FFmpegError
 
 MAX_VIDEO_DURATION = 300  # 5 minutos en segundos
 
-def validate_video_duration(video_path: str) -> None:
+async def validate_video_duration(video_path: str) -> None:
     try:
-        duration = get_video_duration(video_path)
+        duration = await get_video_duration(video_path)
         if duration > MAX_VIDEO_DURATION:
             duration_seconds = int(duration)
             minutes = duration_seconds // 60
@@ -19,5 +19,5 @@ def validate_video_duration(video_path: str) -> None:
                     f"y este dura {minutes}:{seconds:02d}."
                 ),
             )
-    except subprocess.CalledProcessError:
+    except FFmpegError:
         raise HTTPException(status_code=400, detail="No se pudo leer la duración del video")
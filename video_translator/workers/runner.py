@@ -1,33 +1,68 @@
 import argparse
 import asyncio
 import os
+from contextlib import suppress
+from functools import partial
+from pathlib import Path
 
 import httpx
 
-from video_translator.services.media_service import extract_audio, replace_audio
-from video_translator.services.transcription_service import transcribe_audio
+from video_translator.services.media_service import extract_audio, replace_audio, replace_audio_stream
+from video_translator.services.transcription_service import transcribe_audio, transcribe_segments
 from video_translator.services.translation_service import translate_text
-from video_translator.services.tts_service import generate_audio
+from video_translator.services.tts_service import generate_audio, stream_audio
+from video_translator.services.whisper_pool import shutdown_whisper_pool
+from video_translator.utils.shared.executors import run_io_bound, shutdown_executors
+from video_translator.utils.shared.files import safe_remove_dir
+from video_translator.utils.shared.metrics import JOBS_FINISHED
+from video_translator.utils.shared.pipeline_checkpoint import PipelineCheckpoint
 from video_translator.utils.worker.validate_video_duration import validate_video_duration
 from video_translator.utils.worker import (
+    LeaseLostError,
     claim_job,
     cleanup_temp_files,
     download_file_from_api,
     download_youtube_video,
     get_youtube_duration,
     get_next_job,
+    get_next_jobs,
     is_supported_youtube_url,
     mark_failed,
     process_and_translate,
+    prune_checkpoints,
+    report_checkpoint,
+    send_heartbeat,
+    serve_metrics,
     upload_file_to_api,
 )
 
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9101"))
+WORKER_CHECKPOINT_DIR = os.getenv(
+    "WORKER_CHECKPOINT_DIR", str(Path(__file__).resolve().parents[2] / "worker_checkpoints")
+)
+# Los checkpoints de un job fallido se guardan para un requeue; pasado este tiempo sin tocarse se borran
+WORKER_CHECKPOINT_MAX_AGE_HOURS = float(os.getenv("WORKER_CHECKPOINT_MAX_AGE_HOURS", "24"))
+# Cada cuánto se renueva el lease del job en curso; debe ser bastante menor que JOB_LEASE_SECONDS de la API
+WORKER_HEARTBEAT_SECONDS = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "30"))
+# Jobs que el worker procesa a la vez; el pool de Whisper reparte las transcripciones entre ellos
+WORKER_SLOTS = int(os.getenv("WORKER_SLOTS", "1"))
+UPLOAD_RETRIES = 3
+
 
 class Worker:
-    def __init__(self, api_url: str, api_key: str, worker_id: str | None = None):
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        worker_id: str | None = None,
+        metrics_port: int = WORKER_METRICS_PORT,
+        slots: int = WORKER_SLOTS,
+    ):
         self.api_url = api_url.rstrip("/")
         self.api_key = api_key
         self.worker_id = worker_id or "default-worker"
+        self.metrics_port = metrics_port
+        self.slots = max(1, slots)
         self.client = httpx.AsyncClient(
             timeout=httpx.Timeout(300.0, connect=10.0),
             headers={"X-API-Key": api_key},
@@ -36,90 +71,197 @@ class Worker:
     async def get_next_job(self):
         return await get_next_job(self.client, self.api_url, self.worker_id)
 
+    async def get_next_jobs(self, max_jobs: int) -> list[dict]:
+        return await get_next_jobs(self.client, self.api_url, self.worker_id, max_jobs)
+
     async def claim_job(self, job_id: str) -> bool:
         return await claim_job(self.client, self.api_url, job_id, self.worker_id)
 
     async def download_input(self, job_id: str, local_path: str):
         return await download_file_from_api(self.client, self.api_url, job_id, local_path)
 
-    async def process_video(self, input_path: str, output_path: str):
+    async def process_video(
+        self, input_path: str, output_path: str, checkpoint_dir=None, on_checkpoint=None, translation_backend=None
+    ):
         await process_and_translate(
             input_path,
             output_path,
             extract_audio,
             transcribe_audio,
-            translate_text,
+            partial(translate_text, backend=translation_backend),
             generate_audio,
             replace_audio,
+            transcribe_segments=transcribe_segments,
+            checkpoint_dir=checkpoint_dir,
+            on_checkpoint=on_checkpoint,
+            stream_audio=stream_audio,
+            replace_audio_stream=replace_audio_stream,
         )
 
     async def upload_result(self, job_id: str, output_path: str):
-        return await upload_file_to_api(self.client, self.api_url, job_id, output_path)
+        return await upload_file_to_api(self.client, self.api_url, job_id, self.worker_id, output_path)
 
     async def mark_failed(self, job_id: str, error_message: str):
         await mark_failed(self.client, self.api_url, job_id, self.worker_id, error_message)
 
+    async def report_checkpoint(self, job_id: str, stage: str):
+        await report_checkpoint(self.client, self.api_url, job_id, self.worker_id, stage)
+
+    async def keep_lease(self, job_id: str):
+        """Envía heartbeats hasta que se cancela; retorna si la API indica que el job ya es de otro worker."""
+        while True:
+            await asyncio.sleep(WORKER_HEARTBEAT_SECONDS)
+            if not await send_heartbeat(self.client, self.api_url, job_id, self.worker_id):
+                return
+
+    async def prune_checkpoints(self):
+        removed = await run_io_bound(
+            prune_checkpoints, WORKER_CHECKPOINT_DIR, WORKER_CHECKPOINT_MAX_AGE_HOURS * 3600
+        )
+        if removed:
+            print(f"🧹 {removed} checkpoint(s) antiguos eliminados")
+
+    async def upload_with_retries(self, job_id: str, output_path: str) -> bool:
+        """Reintenta solo la subida; el video ya procesado queda en el checkpoint.
+
+        Un 409 (lease perdido) no se reintenta: LeaseLostError llega a run_job.
+        """
+        for attempt in range(1, UPLOAD_RETRIES + 1):
+            if await self.upload_result(job_id, output_path):
+                return True
+            if attempt < UPLOAD_RETRIES:
+                delay = 2 ** attempt
+                print(f"  🔁 Reintentando subida en {delay}s ({attempt}/{UPLOAD_RETRIES})...")
+                await asyncio.sleep(delay)
+        return False
+
+    async def fetch_input(self, job_id: str, input_path: str | None, local_input: str):
+        download_path = f"{local_input}.download.mp4"
+        cleanup_temp_files(download_path)
+        if input_path and is_supported_youtube_url(input_path):
+            duration = await run_io_bound(get_youtube_duration, input_path)
+            if duration > 300:
+                duration_seconds = int(duration)
+                minutes = duration_seconds // 60
+                seconds = duration_seconds % 60
+                raise ValueError(
+                    "Hermano, te pasaste 😅 ¿Qué piensas, que tengo un ordenador de la NASA o qué? "
+                    "El límite es de 5 minutos por video "
+                    f"y este dura {minutes}:{seconds:02d}."
+                )
+            await download_youtube_video(input_path, download_path)
+            os.replace(download_path, local_input)
+            try:
+                # El probe queda cacheado para local_input y extract_audio lo reutiliza
+                await validate_video_duration(local_input)
+            except Exception:
+                cleanup_temp_files(local_input)
+                raise
+        else:
+            await self.download_input(job_id, download_path)
+            # Solo una descarga completa queda como input del checkpoint
+            os.replace(download_path, local_input)
+
     async def process_job(self, job):
+        """Procesa el job renovando su lease; si la API lo reasigna, se cancela el trabajo en curso."""
+        job_id = job["id"]
+        work = asyncio.create_task(self.run_job(job))
+        heartbeat = asyncio.create_task(self.keep_lease(job_id))
+        try:
+            await asyncio.wait({work, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+            if not work.done():
+                print(f"🛑 Lease del job {job_id} perdido: otro worker lo retoma, se cancela este procesamiento")
+                work.cancel()
+                with suppress(asyncio.CancelledError):
+                    await work
+                safe_remove_dir(os.path.join(WORKER_CHECKPOINT_DIR, job_id))
+        finally:
+            work.cancel()
+            heartbeat.cancel()
+            await asyncio.gather(work, heartbeat, return_exceptions=True)
+
+    async def run_job(self, job):
         job_id = job["id"]
         input_path = job.get("input_path")
 
         print(f"\n🚀 Procesando job {job_id}")
 
-        import tempfile
+        checkpoint_dir = os.path.join(WORKER_CHECKPOINT_DIR, job_id)
+        checkpoint = PipelineCheckpoint(checkpoint_dir)
+        local_input = checkpoint.path("input.mp4")
+        local_output = checkpoint.path("output.mp4")
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            local_input = os.path.join(tmpdir, "input.mp4")
-            local_output = os.path.join(tmpdir, "output.mp4")
+        try:
+            if checkpoint.is_done("replace_audio"):
+                print("  ♻️  Video ya procesado en un intento anterior, solo se reintenta la subida")
+            else:
+                if not os.path.exists(local_input):
+                    await self.fetch_input(job_id, input_path, local_input)
 
-            try:
-                if input_path and is_supported_youtube_url(input_path):
-                    duration = get_youtube_duration(input_path)
-                    if duration > 300:
-                        duration_seconds = int(duration)
-                        minutes = duration_seconds // 60
-                        seconds = duration_seconds % 60
-                        raise ValueError(
-                            "Hermano, te pasaste 😅 ¿Qué piensas, que tengo un ordenador de la NASA o qué? "
-                            "El límite es de 5 minutos por video "
-                            f"y este dura {minutes}:{seconds:02d}."
-                        )
-                    await download_youtube_video(input_path, local_input)
-                    validate_video_duration(local_input)
-                else:
-                    await self.download_input(job_id, local_input)
-
-                await self.process_video(local_input, local_output)
-
-                if await self.upload_result(job_id, local_output):
-                    print(f"✅ Job {job_id} completado exitosamente")
-                else:
-                    await self.mark_failed(job_id, "Error al subir resultado")
-
-            except Exception as error:
-                print(f"❌ Error procesando job {job_id}: {error}")
-                await self.mark_failed(job_id, str(error))
-            finally:
-                cleanup_temp_files(local_input, local_output)
+                async def on_checkpoint(stage: str) -> None:
+                    await self.report_checkpoint(job_id, stage)
+
+                await self.process_video(
+                    local_input, local_output, checkpoint_dir, on_checkpoint, job.get("translation_backend")
+                )
+
+            if await self.upload_with_retries(job_id, local_output):
+                JOBS_FINISHED.inc(status="completed")
+                print(f"✅ Job {job_id} completado exitosamente")
+                safe_remove_dir(checkpoint_dir)
+            else:
+                JOBS_FINISHED.inc(status="failed")
+                await self.mark_failed(job_id, "Error al subir resultado")
+
+        except LeaseLostError as error:
+            # El job ya es de otro worker: no se marca fallido ni hace falta su checkpoint
+            print(f"🛑 {error}")
+            safe_remove_dir(checkpoint_dir)
+        except Exception as error:
+            JOBS_FINISHED.inc(status="failed")
+            print(f"❌ Error procesando job {job_id}: {error}")
+            print(f"  💾 Checkpoints conservados en {checkpoint_dir}")
+            await self.mark_failed(job_id, str(error))
 
     async def run(self, poll_interval: int = 5):
         print(f"🤖 Worker iniciado: {self.worker_id}")
         print(f"🌐 API: {self.api_url}")
-        print(f"⏱️  Intervalo de polling: {poll_interval}s\n")
+        print(f"⏱️  Intervalo de polling: {poll_interval}s")
+        print(f"🧵 Slots: {self.slots}\n")
+
+        metrics_server = await serve_metrics(self.metrics_port) if self.metrics_port else None
+        running: set[asyncio.Task] = set()
 
         try:
             while True:
-                job = await self.get_next_job()
+                # Una sola petición llena todos los slots libres
+                free_slots = self.slots - len(running)
+                jobs = await self.get_next_jobs(free_slots) if free_slots else []
+                for job in jobs:
+                    running.add(asyncio.create_task(self.process_job(job)))
 
-                if job:
-                    await self.process_job(job)
-                else:
+                if not running:
+                    await self.prune_checkpoints()
                     print("⏸️  No hay jobs pendientes, esperando...")
                     await asyncio.sleep(poll_interval)
+                    continue
+
+                # Con slots libres la cola quedó vacía: se vuelve a consultar tras poll_interval o
+                # cuando termine un job, lo que ocurra antes
+                timeout = poll_interval if len(running) < self.slots else None
+                _, running = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
 
         except KeyboardInterrupt:
             print("\n\n👋 Worker detenido por el usuario")
         finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            if metrics_server:
+                metrics_server.close()
             await self.client.aclose()
+            shutdown_whisper_pool()
+            shutdown_executors()
 
 
 def main():
@@ -128,10 +270,23 @@ def main():
     parser.add_argument("--api-key", required=True, help="Token de autenticación")
     parser.add_argument("--poll-interval", type=int, default=5, help="Intervalo de polling en segundos")
     parser.add_argument("--worker-id", help="Identificador del worker")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=WORKER_METRICS_PORT,
+        help="Puerto local para exponer /metrics (0 lo desactiva)",
+    )
+    parser.add_argument("--slots", type=int, default=WORKER_SLOTS, help="Jobs procesados a la vez")
 
     args = parser.parse_args()
 
-    worker = Worker(api_url=args.api_url, api_key=args.api_key, worker_id=args.worker_id)
+    worker = Worker(
+        api_url=args.api_url,
+        api_key=args.api_key,
+        worker_id=args.worker_id,
+        metrics_port=args.metrics_port,
+        slots=args.slots,
+    )
 
     asyncio.run(worker.run(poll_interval=args.poll_interval))
 